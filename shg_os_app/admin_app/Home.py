@@ -17,11 +17,8 @@ APP_ROOT = CURRENT_DIR.parent                         # .../shg_os_app
 # Make "admin_app" importable as a package
 sys.path.insert(0, str(APP_ROOT))
 
-from admin_app.backend.database import init_db
 from admin_app.backend.shg_ops import get_shgs
-from admin_app.backend.tx_ops import get_transactions
-from admin_app.backend.product_ops import get_products
-from admin_app.backend.business_logic import compute_summary_and_advice
+from admin_app.backend.summary_cache import get_shg_dashboard
 from admin_app.components.ui_cards import section_header, glass_card
 from admin_app.components.charts import income_expense_chart
 
@@ -34,11 +31,6 @@ st.set_page_config(
     layout="wide",
 )
 
-# -----------------------------------------------------
-# INITIALISE DATABASE
-# -----------------------------------------------------
-init_db()
-
 # -----------------------------------------------------
 # HEADER SECTION
 # -----------------------------------------------------
@@ -72,10 +64,9 @@ selected_label = st.selectbox(
 selected_shg_id = id_map[selected_label]
 
 # -----------------------------------------------------
-# LOAD TRANSACTIONS & PRODUCTS
+# LOAD CASHFLOW SUMMARY (cached until this SHG's data changes)
 # -----------------------------------------------------
-txs = get_transactions(selected_shg_id)
-products = get_products(selected_shg_id)
+dashboard = get_shg_dashboard(selected_shg_id)
 
 (
     total_income,
@@ -84,7 +75,7 @@ products = get_products(selected_shg_id)
     score,
     inventory_value,
     rec,
-) = compute_summary_and_advice(txs, products)
+) = dashboard["summary"]
 
 # -----------------------------------------------------
 # TOP KPI CARDS
@@ -133,7 +124,7 @@ section_header(
     "📈",
     "Income vs expense over time",
 )
-income_expense_chart(txs)
+income_expense_chart(dashboard["daily"])
 
 # -----------------------------------------------------
 # INVENTORY + INSIGHTS
@@ -39,7 +39,8 @@ def load_shg_base():
 # ---------- PREPARE INSIGHT BUNDLE ----------
 def prepare_insight_bundle():
     base = load_shg_base()
-    clusters, summary = compute_shg_clusters(6)
+    # Labels of the saved model, at the k it was fitted with
+    clusters, summary, _ = compute_shg_clusters(None, mode="model")
     health_df, health_summary = compute_shg_health()
 
     under_df = get_underutilized_shgs()
@@ -1,4 +1,4 @@
-from .product_ops import get_inventory_for_product
+from .summary_engine import load_shg_snapshot
 from backend.safe_utils import safe_float
 
 
@@ -9,18 +9,17 @@ def safe_float(x):
         return 0.0
 
 
-def compute_summary_and_advice(transactions, products):
-    total_income = 0.0
-    total_expense = 0.0
+# Recommendation codes shared with the portfolio credibility engine
+REC_MESSAGES = {
+    "deficit": "Your expenses are higher than income. Reduce non-essential spending and increase income-generating activities.",
+    "excess_inventory": "You are holding a lot of inventory. Focus on selling existing stock before producing more.",
+    "few_records": "Good surplus, but very few transactions recorded. Train members to log every sale, purchase, and expense.",
+    "reinvest": "Great job maintaining a surplus. Consider reinvesting part of it into your most profitable products.",
+}
 
-    for _id, tx_date, amount, tx_type, desc, product_id, qty in transactions:
-        if tx_type in ["income", "loan_repaid", "savings", "sale"]:
-            total_income += safe_float(amount)
-        elif tx_type in ["expense", "loan_disbursed", "purchase"]:
-            total_expense += safe_float(amount)
 
+def _score_and_advise(total_income, total_expense, num_txs, inventory_value):
     balance = total_income - total_expense
-    num_txs = len(transactions)
 
     score = 50
     if balance >= 0:
@@ -32,20 +31,25 @@ def compute_summary_and_advice(transactions, products):
     else:
         score = 45
 
-    inventory_value = 0.0
-    for p in products:
-        p_id, name, category, unit, cost_price, selling_price = p
-        qty = get_inventory_for_product(p_id)
-        cp = safe_float(cost_price)
-        inventory_value += qty * cp
-
     if balance < 0:
-        rec = "Your expenses are higher than income. Reduce non-essential spending and increase income-generating activities."
+        rec = REC_MESSAGES["deficit"]
     elif balance >= 0 and inventory_value > 0 and inventory_value > (balance * 2):
-        rec = "You are holding a lot of inventory. Focus on selling existing stock before producing more."
+        rec = REC_MESSAGES["excess_inventory"]
     elif balance >= 0 and num_txs < 5:
-        rec = "Good surplus, but very few transactions recorded. Train members to log every sale, purchase, and expense."
+        rec = REC_MESSAGES["few_records"]
     else:
-        rec = "Great job maintaining a surplus. Consider reinvesting part of it into your most profitable products."
+        rec = REC_MESSAGES["reinvest"]
+
+    return total_income, total_expense, balance, score, inventory_value, rec
+
 
-    return total_income, total_expense, balance, score, inventory_value, rec
\ No newline at end of file
+def compute_shg_summary(shg_id):
+    """
+    (income, expense, balance, score, inventory_value, rec) for an SHG,
+    computed by one grouped SQL statement over the daily rollup and
+    current stock tables.
+    """
+    total_income, total_expense, num_txs, inventory_value = load_shg_snapshot(shg_id)
+    return _score_and_advise(
+        safe_float(total_income), safe_float(total_expense), int(num_txs), safe_float(inventory_value)
+    )
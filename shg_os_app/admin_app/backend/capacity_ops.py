@@ -1,4 +1,4 @@
-from .database import get_connection
+from .database import get_connection, insert_many
 
 def add_capacity(shg_id, product_name, monthly_capacity, supply_ready):
     conn = get_connection()
@@ -13,6 +13,18 @@ def add_capacity(shg_id, product_name, monthly_capacity, supply_ready):
     conn.commit()
     conn.close()
 
+def add_capacities(records):
+    """
+    Bulk version of add_capacity. records: DataFrame / dicts with shg_id,
+    product_name, monthly_capacity, supply_ready — or tuples in that order.
+    Returns the new shg_production ids.
+    """
+    return insert_many(
+        "shg_production",
+        ["shg_id", "product_name", "monthly_capacity", "supply_ready"],
+        records,
+    )
+
 def get_capacity_for_shg(shg_id):
     conn = get_connection()
     cur = conn.cursor()
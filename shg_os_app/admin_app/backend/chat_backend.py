@@ -1,22 +1,18 @@
 import os
-import sqlite3
 from datetime import datetime
 from pathlib import Path
 import uuid
 import shutil
 
+from backend.database import get_connection
+
 # ---------- PATHS ----------
 PHASE2_ROOT = r"C:\Users\sumit\Desktop\IMPACTATHON\PHASE_2"
-DB_PATH = Path(PHASE2_ROOT) / "streamlit_app" / "shg_os.db"
 MEDIA_FOLDER = Path(PHASE2_ROOT) / "streamlit_app" / "uploads"
 
 MEDIA_FOLDER.mkdir(parents=True, exist_ok=True)
 
 
-def get_connection():
-    return sqlite3.connect(DB_PATH)
-
-
 # ---------- MEDIA HANDLING ----------
 def save_media_file(uploaded_file):
     """
@@ -112,7 +108,9 @@ def load_messages(filter_mode: str = "all",
     if where_clauses:
         base += " WHERE " + " AND ".join(where_clauses)
 
-    base += " ORDER BY datetime(timestamp) ASC"
+    # timestamps are ISO strings, so plain ordering matches datetime()
+    # and lets SQLite walk the (..., timestamp) indexes
+    base += " ORDER BY timestamp ASC"
 
     cur.execute(base, params)
     rows = cur.fetchall()
@@ -0,0 +1,290 @@
+"""
+Persisted SHG cluster model.
+
+refit_model() fits StandardScaler + KMeans on the feature store and
+stores the scaling parameters and centroids in cluster_model under a new
+version. Cluster ids are stable across refits: each new centroid is
+matched (Hungarian assignment on centroid distance) to a centroid of the
+previous version and inherits its label; the label-mapping diff is stored
+with the model.
+
+Assigning a cluster afterwards is a nearest-centroid lookup, so a new
+SHG gets its label without refitting anything:
+
+    assign_cluster(shg_id)          # one SHG, persisted in shg_cluster
+    predict_clusters(features_df)   # any frame with the numeric features
+
+Run from admin_app/ (e.g. nightly from cron):
+    python -m backend.cluster_model refit --clusters 6 --if-changed
+    python -m backend.cluster_model assign 42
+"""
+import argparse
+import json
+import threading
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from scipy.optimize import linear_sum_assignment
+from sklearn.cluster import KMeans
+from sklearn.preprocessing import StandardScaler
+
+from backend.database import get_connection, transaction
+from backend.feature_store import (
+    NUMERIC_FEATURES,
+    build_shg_feature_matrix,
+    get_data_version,
+    get_shg_feature_matrix,
+)
+
+
+# SQLite's default limit on host parameters per statement is 999
+ID_CHUNK = 900
+
+_lock = threading.Lock()
+_active = None   # last loaded model dict
+
+
+def _row_to_model(row):
+    return {
+        "version": row["version"],
+        "n_clusters": row["n_clusters"],
+        "feature_cols": json.loads(row["feature_cols"]),
+        "mean": np.array(json.loads(row["scaler_mean"]), dtype=float),
+        "scale": np.array(json.loads(row["scaler_scale"]), dtype=float),
+        "centroids": np.array(json.loads(row["centroids"]), dtype=float),
+        "labels": np.array(json.loads(row["labels"]), dtype=int),
+        "inertia": row["inertia"],
+        "n_samples": row["n_samples"],
+        "data_version": json.loads(row["data_version"]) if row["data_version"] else None,
+        "label_diff": json.loads(row["label_diff"]) if row["label_diff"] else None,
+        "fitted_at": row["fitted_at"],
+    }
+
+
+def load_active_model():
+    """Latest persisted model (None if nothing was fitted yet)."""
+    global _active
+
+    conn = get_connection()
+    latest = conn.execute("SELECT MAX(version) FROM cluster_model;").fetchone()[0]
+    if latest is None:
+        conn.close()
+        return None
+
+    with _lock:
+        if _active is None or _active["version"] != latest:
+            cur = conn.execute(
+                "SELECT * FROM cluster_model WHERE version = ?;", (latest,)
+            )
+            columns = [c[0] for c in cur.description]
+            _active = _row_to_model(dict(zip(columns, cur.fetchone())))
+        model = _active
+    conn.close()
+    return model
+
+
+def predict_clusters(features, model=None):
+    """
+    Stable cluster label of every row of `features` (a frame with the
+    model's numeric columns), via nearest scaled centroid.
+    """
+    model = model or load_active_model()
+    if model is None:
+        raise RuntimeError("No cluster model fitted yet; run refit_model() first.")
+
+    X = features[model["feature_cols"]].to_numpy(dtype=float)
+    Z = (X - model["mean"]) / model["scale"]
+    C = model["centroids"]
+    # argmin ||z - c||^2 == argmin (||c||^2 - 2 z.c); avoids an n x k x d array
+    dist = (C ** 2).sum(axis=1) - 2.0 * Z @ C.T
+    return model["labels"][dist.argmin(axis=1)]
+
+
+def _store_assignments(conn, shg_ids, labels, version):
+    now = datetime.now().isoformat()
+    conn.executemany(
+        """
+        INSERT INTO shg_cluster (shg_id, cluster_label, model_version, assigned_at)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT(shg_id) DO UPDATE SET
+            cluster_label = excluded.cluster_label,
+            model_version = excluded.model_version,
+            assigned_at = excluded.assigned_at;
+        """,
+        [(int(s), int(l), version, now) for s, l in zip(shg_ids, labels)],
+    )
+
+
+def assign_clusters(shg_ids):
+    """
+    Label the given SHGs with the active model and persist the result.
+    Returns {shg_id: cluster_label}; empty if no model has been fitted.
+    """
+    model = load_active_model()
+    shg_ids = [int(i) for i in shg_ids]
+    if model is None or not shg_ids:
+        return {}
+
+    assigned = {}
+    for start in range(0, len(shg_ids), ID_CHUNK):
+        features = build_shg_feature_matrix(shg_ids[start:start + ID_CHUNK])
+        if features.empty:
+            continue
+        labels = predict_clusters(features, model)
+        with transaction() as conn:
+            _store_assignments(conn, features["shg_id"], labels, model["version"])
+        assigned.update(zip(features["shg_id"].astype(int), labels.astype(int).tolist()))
+    return assigned
+
+
+def assign_cluster(shg_id):
+    """Cluster label for one SHG (None if no model has been fitted)."""
+    return assign_clusters([shg_id]).get(int(shg_id))
+
+
+def get_cluster_assignments():
+    """Persisted labels: DataFrame[shg_id, cluster_label, model_version, assigned_at]."""
+    conn = get_connection()
+    df = pd.read_sql_query("SELECT * FROM shg_cluster ORDER BY shg_id;", conn)
+    conn.close()
+    return df
+
+
+def _match_labels(previous, centroids, scaler):
+    """
+    Stable labels for the new centroids plus the label-mapping diff
+    against the previous model.
+    """
+    k = len(centroids)
+    if previous is None:
+        return np.arange(1, k + 1), {
+            "previous_version": None,
+            "kept": [],
+            "new_labels": list(range(1, k + 1)),
+            "retired_labels": [],
+        }
+
+    # Previous centroids back in raw units, then into the new scaled space
+    prev_raw = previous["centroids"] * previous["scale"] + previous["mean"]
+    prev_scaled = scaler.transform(pd.DataFrame(prev_raw, columns=NUMERIC_FEATURES))
+    cost = np.sqrt(((centroids[:, None, :] - prev_scaled[None, :, :]) ** 2).sum(axis=2))
+    rows, cols = linear_sum_assignment(cost)
+
+    labels = np.zeros(k, dtype=int)
+    kept = []
+    for new_i, prev_i in zip(rows, cols):
+        label = int(previous["labels"][prev_i])
+        labels[new_i] = label
+        kept.append({"label": label, "centroid_shift": round(float(cost[new_i, prev_i]), 4)})
+
+    next_label = int(previous["labels"].max()) + 1
+    new_labels = []
+    for new_i in sorted(set(range(k)) - set(rows.tolist())):
+        labels[new_i] = next_label
+        new_labels.append(next_label)
+        next_label += 1
+
+    retired = sorted(
+        int(previous["labels"][i])
+        for i in set(range(len(previous["labels"]))) - set(cols.tolist())
+    )
+    return labels, {
+        "previous_version": previous["version"],
+        "kept": sorted(kept, key=lambda r: r["label"]),
+        "new_labels": new_labels,
+        "retired_labels": retired,
+    }
+
+
+def refit_model(n_clusters: int = 6, if_changed: bool = False):
+    """
+    Fit a new model version on the current feature store and relabel
+    every SHG. With if_changed, skip the fit when neither the data nor
+    n_clusters changed since the active model.
+
+    Returns (version, label_diff), or (None, None) if nothing was fitted.
+    """
+    data_version = list(get_data_version())
+    previous = load_active_model()
+    if (
+        if_changed
+        and previous is not None
+        and previous["data_version"] == data_version
+        and previous["n_clusters"] == n_clusters
+    ):
+        return None, None
+
+    features = get_shg_feature_matrix()
+    if features.empty:
+        return None, None
+
+    k = max(1, min(n_clusters, len(features)))
+    scaler = StandardScaler().fit(features[NUMERIC_FEATURES])
+    Z = scaler.transform(features[NUMERIC_FEATURES])
+    kmeans = KMeans(n_clusters=k, random_state=42, n_init=10).fit(Z)
+
+    labels, diff = _match_labels(previous, kmeans.cluster_centers_, scaler)
+    shg_labels = labels[kmeans.labels_]
+
+    before = dict(get_cluster_assignments()[["shg_id", "cluster_label"]].itertuples(index=False))
+    diff["moved_shgs"] = int(sum(
+        1 for s, l in zip(features["shg_id"], shg_labels)
+        if s in before and before[s] != l
+    ))
+    diff["relabelled_shgs"] = len(features)
+
+    with transaction() as conn:
+        cur = conn.execute(
+            """
+            INSERT INTO cluster_model (
+                n_clusters, feature_cols, scaler_mean, scaler_scale,
+                centroids, labels, inertia, n_samples, data_version,
+                label_diff, fitted_at
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?);
+            """,
+            (
+                n_clusters,
+                json.dumps(NUMERIC_FEATURES),
+                json.dumps(scaler.mean_.tolist()),
+                json.dumps(scaler.scale_.tolist()),
+                json.dumps(kmeans.cluster_centers_.tolist()),
+                json.dumps(labels.tolist()),
+                float(kmeans.inertia_),
+                len(features),
+                json.dumps(data_version),
+                json.dumps(diff),
+                datetime.now().isoformat(),
+            ),
+        )
+        version = cur.lastrowid
+        conn.execute("DELETE FROM shg_cluster;")
+        _store_assignments(conn, features["shg_id"], shg_labels, version)
+
+    return version, diff
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fit or apply the persisted SHG cluster model.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    refit = sub.add_parser("refit", help="fit a new model version")
+    refit.add_argument("--clusters", type=int, default=6)
+    refit.add_argument("--if-changed", action="store_true",
+                       help="skip when data and k are unchanged")
+
+    assign = sub.add_parser("assign", help="label SHGs with the active model")
+    assign.add_argument("shg_ids", type=int, nargs="+")
+
+    args = parser.parse_args()
+
+    if args.command == "refit":
+        version, diff = refit_model(args.clusters, args.if_changed)
+        if version is None:
+            print("✔ Model is up to date (or no SHG data); nothing fitted")
+        else:
+            print(f"✔ Fitted cluster model v{version}")
+            print(json.dumps(diff, indent=2))
+    else:
+        for shg_id, label in assign_clusters(args.shg_ids).items():
+            print(f"SHG {shg_id} → cluster {label}")
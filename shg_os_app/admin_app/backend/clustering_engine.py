@@ -1,172 +1,231 @@
+import copy
+import threading
+
 import pandas as pd
 import numpy as np
-from sklearn.cluster import KMeans
+from sklearn.cluster import KMeans, MiniBatchKMeans
 from backend.safe_utils import safe_float
 
-from .database import get_connection
+from .feature_store import NUMERIC_FEATURES as NUMERIC_COLS, get_data_version, get_shg_feature_matrix
+from .cluster_model import load_active_model, predict_clusters
+
+DEFAULT_CLUSTERS = 6
+
+# "auto" switches from full KMeans to the streaming fit above this many SHGs
+STREAMING_MIN_SHGS = 5000
+STREAM_BATCH_SIZE = 1024
+STREAM_MAX_EPOCHS = 20
+STREAM_TOL = 1e-4          # relative inertia change that counts as converged
+
+# Streaming model kept between calls so new SHGs can be absorbed with
+# partial_fit instead of refitting the whole portfolio. "seen" maps each
+# SHG fed to the model to a hash of its feature row.
+_stream = {"model": None, "n_clusters": None, "batch_size": None, "seen": {}}
+_stream_lock = threading.Lock()
+
+# One-off "model"-mode fallbacks, which are never saved, kept per
+# (feature-store data version, k, batch_size) so reruns reuse them
+_preview_cache = {}
+_preview_lock = threading.Lock()
 
 
 def load_shg_feature_matrix():
     """
-    Build a feature table per SHG:
-    - dominant skill
-    - avg member income
-    - avg savings
-    - avg years of experience
-    - total monthly capacity
-    - total supply ready
+    Per-SHG feature table (see feature_store.build_shg_feature_matrix).
+    Served from the shared feature store, so it is only rebuilt after the
+    underlying tables change.
     """
-    conn = get_connection()
-
-    # ---- Base SHG info ----
-    shg_df = pd.read_sql_query(
-        "SELECT id AS shg_id, name, village, district, state FROM shg;",
-        conn,
-    )
-
-    if shg_df.empty:
-        conn.close()
-        return pd.DataFrame()
-
-    # ---- Skills per SHG ----
-    skills_df = pd.read_sql_query(
-        """
-        SELECT m.shg_id, s.skill_category, s.years_experience
-        FROM member m
-        JOIN member_skills s ON m.id = s.member_id
-        """,
-        conn,
-    )
-
-    # ---- Financials per SHG ----
-    fin_df = pd.read_sql_query(
-        """
-        SELECT m.shg_id,
-               f.monthly_income,
-               f.monthly_expense,
-               f.savings
-        FROM member m
-        JOIN member_financials f ON m.id = f.member_id
-        """,
-        conn,
-    )
-
-    # ---- Capacity per SHG ----
-    cap_df = pd.read_sql_query(
-        """
-        SELECT shg_id, monthly_capacity, supply_ready
-        FROM shg_production
-        """,
-        conn,
-    )
-
-    conn.close()
-
-    # Aggregate: dominant skill, avg experience
-    if not skills_df.empty:
-        # Dominant skill
-        dom_skill = (
-            skills_df.groupby("shg_id")["skill_category"]
-            .agg(lambda x: x.value_counts().idxmax())
-            .rename("dominant_skill")
-        )
-        avg_exp = (
-            skills_df.groupby("shg_id")["years_experience"]
-            .mean()
-            .rename("avg_experience")
-        )
-    else:
-        dom_skill = pd.Series(dtype=str, name="dominant_skill")
-        avg_exp = pd.Series(dtype=float, name="avg_experience")
-
-    # Aggregate financials
-    if not fin_df.empty:
-        fin_agg = fin_df.groupby("shg_id").agg(
-            avg_income=("monthly_income", "mean"),
-            avg_expense=("monthly_expense", "mean"),
-            avg_savings=("savings", "mean"),
+    return get_shg_feature_matrix()
+
+
+def _partial_fit_epoch(model, X, batch_size, rng):
+    """One shuffled pass over X in chunks; returns the number of batches."""
+    order = rng.permutation(len(X))
+    batches = 0
+    for start in range(0, len(X), batch_size):
+        model.partial_fit(X[order[start:start + batch_size]])
+        batches += 1
+    return batches
+
+
+def fit_streaming(features, n_clusters, batch_size=STREAM_BATCH_SIZE):
+    """
+    MiniBatchKMeans fitted chunk by chunk with partial_fit.
+
+    The model is kept in memory: when the SHGs seen so far are all still
+    present with unchanged features, only the newly added ones are
+    streamed through partial_fit. Otherwise (first call, different k /
+    batch size, SHGs removed or their features edited) it is refitted with
+    shuffled epochs until the inertia stops improving, since partial_fit
+    cannot take back what it learnt from the old rows.
+
+    Returns (model, metrics).
+    """
+    X = features[NUMERIC_COLS].to_numpy(dtype=float)
+    row_hashes = pd.util.hash_pandas_object(features[NUMERIC_COLS], index=False)
+    current = dict(zip(features["shg_id"].tolist(), row_hashes.tolist()))
+    # the first partial_fit call needs at least n_clusters samples
+    batch_size = max(int(batch_size), n_clusters)
+    rng = np.random.default_rng(42)
+
+    with _stream_lock:
+        model = _stream["model"]
+        reuse = (
+            model is not None
+            and _stream["n_clusters"] == n_clusters
+            and _stream["batch_size"] == batch_size
+            and all(current.get(shg_id) == h for shg_id, h in _stream["seen"].items())
         )
-    else:
-        fin_agg = pd.DataFrame(columns=["avg_income", "avg_expense", "avg_savings"])
 
-    # Aggregate capacity
-    if not cap_df.empty:
-        cap_agg = cap_df.groupby("shg_id").agg(
-            total_capacity=("monthly_capacity", "sum"),
-            total_supply_ready=("supply_ready", "sum"),
+        history = []
+        batches = epochs = 0
+        if reuse:
+            new_mask = ~features["shg_id"].isin(_stream["seen"]).to_numpy()
+            absorbed = int(new_mask.sum())
+            if absorbed:
+                batches = _partial_fit_epoch(model, X[new_mask], batch_size, rng)
+                epochs = 1
+            history.append(-model.score(X))
+            converged = True
+        else:
+            absorbed = len(X)
+            model = MiniBatchKMeans(
+                n_clusters=n_clusters,
+                batch_size=batch_size,
+                random_state=42,
+            )
+            converged = False
+            while epochs < STREAM_MAX_EPOCHS:
+                batches += _partial_fit_epoch(model, X, batch_size, rng)
+                epochs += 1
+                history.append(-model.score(X))
+                if len(history) > 1:
+                    prev = history[-2]
+                    if prev == 0 or abs(prev - history[-1]) / prev < STREAM_TOL:
+                        converged = True
+                        break
+
+        _stream.update(
+            model=model, n_clusters=n_clusters, batch_size=batch_size, seen=current
         )
-    else:
-        cap_agg = pd.DataFrame(columns=["total_capacity", "total_supply_ready"])
-
-    # Merge all
-    features = (
-        shg_df.set_index("shg_id")
-        .join(dom_skill, how="left")
-        .join(avg_exp, how="left")
-        .join(fin_agg, how="left")
-        .join(cap_agg, how="left")
-        .reset_index()
-    )
-
-    # Fill missing numeric values with 0
-    num_cols = [
-        "avg_experience",
-        "avg_income",
-        "avg_expense",
-        "avg_savings",
-        "total_capacity",
-        "total_supply_ready",
-    ]
-    for c in num_cols:
-        if c in features.columns:
-            features[c] = features[c].fillna(0.0)
-
-    # Fill dominant skill if missing
-    if "dominant_skill" in features.columns:
-        features["dominant_skill"] = features["dominant_skill"].fillna("Unknown")
-    else:
-        features["dominant_skill"] = "Unknown"
 
-    return features
+    metrics = {
+        "mode": "streaming",
+        "n_samples": len(X),
+        "n_clusters": n_clusters,
+        "batch_size": batch_size,
+        "incremental": reuse,
+        "absorbed": absorbed,
+        "epochs": epochs,
+        "batches": batches,
+        "inertia": float(history[-1]),
+        "inertia_history": [float(v) for v in history],
+        "converged": converged,
+    }
+    return model, metrics
+
 
+def reset_streaming_model():
+    """Drop the in-memory streaming model so the next call refits from scratch."""
+    with _stream_lock:
+        _stream.update(model=None, n_clusters=None, batch_size=None, seen={})
 
-def compute_shg_clusters(n_clusters: int = 6):
+
+def compute_shg_clusters(
+    n_clusters: int | None = 6,
+    mode: str = "auto",
+    batch_size: int = STREAM_BATCH_SIZE,
+):
     """
+    mode:
+      - "full": KMeans(n_init=10) on the whole matrix
+      - "streaming": MiniBatchKMeans fed in batch_size chunks (see fit_streaming)
+      - "auto": streaming once there are more than STREAMING_MIN_SHGS SHGs
+      - "model": labels from the persisted cluster model (stable ids across
+        runs). n_clusters=None means the model's own k. The model is only
+        ever fitted by the scheduled refit (python -m backend.cluster_model
+        refit): if none exists yet, or n_clusters asks for a different k,
+        this falls back to a one-off "auto" fit that is not saved
+        (fit_metrics["preview"] is True) and is cached until the feature
+        store's data version changes.
+
     Returns:
-      - shg_features_with_cluster: DataFrame with cluster_id
+      - shg_features_with_cluster: DataFrame with cluster_label (stable
+        label in "model" mode, may have gaps) and cluster_id (0..k-1,
+        contiguous, in label order)
       - cluster_summary: DataFrame with stats per cluster
+      - fit_metrics: dict with the fit's inertia / convergence report
     """
+    preview = False
+    if mode == "model":
+        model = load_active_model()
+        if model is None or (n_clusters is not None and model["n_clusters"] != n_clusters):
+            mode, preview = "auto", True
+        n_clusters = n_clusters or (model["n_clusters"] if model else DEFAULT_CLUSTERS)
+    n_clusters = n_clusters or DEFAULT_CLUSTERS
+
+    if preview:
+        # Version read before the features, like k_selection: a write in
+        # between can only make the cached entry look older, never newer
+        preview_key = (get_data_version(), n_clusters, batch_size)
+        with _preview_lock:
+            if preview_key in _preview_cache:
+                return _copy_result(_preview_cache[preview_key])
+
     features = load_shg_feature_matrix()
     if features.empty:
-        return features, pd.DataFrame()
+        return features, pd.DataFrame(), {}
 
     # numeric feature matrix
-    numeric_cols = [
-        "avg_income",
-        "avg_savings",
-        "avg_experience",
-        "total_capacity",
-        "total_supply_ready",
-    ]
-
-    X = features[numeric_cols].values
+    X = features[NUMERIC_COLS].values
 
     # If SHGs < clusters, reduce clusters
     effective_clusters = min(n_clusters, len(features))
     if effective_clusters < 1:
         effective_clusters = 1
 
-    kmeans = KMeans(
-        n_clusters=effective_clusters,
-        random_state=42,
-        n_init=10,
-    )
-    cluster_labels = kmeans.fit_predict(X)
+    if mode == "auto":
+        mode = "streaming" if len(features) > STREAMING_MIN_SHGS else "full"
 
-    features["cluster_id"] = cluster_labels
+    if mode == "streaming":
+        kmeans, metrics = fit_streaming(features, effective_clusters, batch_size)
+        cluster_labels = kmeans.predict(X) + 1
+    elif mode == "full":
+        kmeans = KMeans(
+            n_clusters=effective_clusters,
+            random_state=42,
+            n_init=10,
+        )
+        cluster_labels = kmeans.fit_predict(X) + 1
+        metrics = {
+            "mode": "full",
+            "n_samples": len(X),
+            "n_clusters": effective_clusters,
+            "iterations": int(kmeans.n_iter_),
+            "inertia": float(kmeans.inertia_),
+            "converged": int(kmeans.n_iter_) < kmeans.max_iter,
+        }
+    elif mode == "model":
+        cluster_labels = predict_clusters(features, model)
+        metrics = {
+            "mode": "model",
+            "n_samples": len(X),
+            "n_clusters": int(len(model["labels"])),
+            "model_version": model["version"],
+            "fitted_at": model["fitted_at"],
+            "inertia": float(model["inertia"]),
+            "label_diff": model["label_diff"],
+            "converged": True,
+        }
+    else:
+        raise ValueError(f"Unknown clustering mode: {mode!r}")
+    metrics["preview"] = preview
 
-    # Make cluster labels start from 1 for display
-    features["cluster_label"] = features["cluster_id"].astype(int) + 1
+    # Labels start from 1 for display. Persisted-model labels survive
+    # refits, so they can skip numbers; cluster_id is always 0..k-1.
+    cluster_labels = np.asarray(cluster_labels, dtype=int)
+    features["cluster_id"] = np.unique(cluster_labels, return_inverse=True)[1].ravel()
+    features["cluster_label"] = cluster_labels
 
     # Build summary
     summary_rows = []
@@ -186,4 +245,18 @@ def compute_shg_clusters(n_clusters: int = 6):
 
     cluster_summary = pd.DataFrame(summary_rows).sort_values("cluster_label")
 
-    return features, cluster_summary
+    if preview:
+        with _preview_lock:
+            # results for older data versions are never looked up again
+            for stale in [key for key in _preview_cache if key[0] != preview_key[0]]:
+                del _preview_cache[stale]
+            _preview_cache[preview_key] = (features, cluster_summary, metrics)
+        return _copy_result((features, cluster_summary, metrics))
+
+    return features, cluster_summary, metrics
+
+
+def _copy_result(result):
+    """Copy of a cached (features, summary, metrics) that callers may modify."""
+    features, cluster_summary, metrics = result
+    return features.copy(), cluster_summary.copy(), copy.deepcopy(metrics)
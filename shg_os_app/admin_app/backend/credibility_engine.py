@@ -0,0 +1,147 @@
+"""
+Portfolio-wide SHG credibility ranking.
+
+Scores every SHG in one grouped SQL pass and stores the ranking in
+shg_credibility. Run from admin_app/ (e.g. nightly, after data imports):
+    python -m backend.credibility_engine --top 10
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+from datetime import datetime
+
+from backend.database import get_connection, insert_many, transaction
+from backend.business_logic import REC_MESSAGES
+
+
+PORTFOLIO_SQL = """
+    SELECT g.id AS shg_id,
+           g.name,
+           g.district,
+           g.state,
+           COALESCE(c.total_income, 0) AS total_income,
+           COALESCE(c.total_expense, 0) AS total_expense,
+           COALESCE(c.num_txs, 0) AS num_txs,
+           COALESCE(v.inventory_value, 0) AS inventory_value
+    FROM shg g
+    LEFT JOIN (
+        SELECT shg_id,
+               SUM(income) AS total_income,
+               SUM(expense) AS total_expense,
+               SUM(tx_count) AS num_txs
+        FROM tx_daily_rollup
+        GROUP BY shg_id
+    ) c ON c.shg_id = g.id
+    LEFT JOIN (
+        SELECT p.shg_id,
+               SUM(COALESCE(s.quantity, 0) * COALESCE(p.cost_price, 0)) AS inventory_value
+        FROM product p
+        LEFT JOIN product_stock s ON s.product_id = p.id
+        GROUP BY p.shg_id
+    ) v ON v.shg_id = g.id
+"""
+
+PERSISTED_COLUMNS = [
+    "shg_id",
+    "total_income",
+    "total_expense",
+    "balance",
+    "num_txs",
+    "inventory_value",
+    "score",
+    "rec_code",
+    "rank",
+]
+
+
+def score_portfolio(df):
+    """
+    Vectorised version of business_logic._score_and_advise over a frame
+    with total_income, total_expense, num_txs, inventory_value columns.
+    Adds balance, score, rec_code, recommendation and rank (1 = best).
+    """
+    df = df.copy()
+    for col in ["total_income", "total_expense", "inventory_value"]:
+        df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0.0)
+    df["num_txs"] = pd.to_numeric(df["num_txs"], errors="coerce").fillna(0).astype(int)
+
+    balance = (df["total_income"] - df["total_expense"]).to_numpy()
+    n = df["num_txs"].to_numpy()
+    inv = df["inventory_value"].to_numpy()
+
+    df["balance"] = balance
+    df["score"] = np.select(
+        [balance < 0, (n >= 20) & (balance > 0), n >= 10],
+        [45, 82, 75],
+        default=65,
+    )
+    df["rec_code"] = np.select(
+        [balance < 0, (inv > 0) & (inv > balance * 2), n < 5],
+        ["deficit", "excess_inventory", "few_records"],
+        default="reinvest",
+    )
+    df["recommendation"] = df["rec_code"].map(REC_MESSAGES)
+
+    # Rank by score, then by cash position
+    df = df.sort_values(["score", "balance"], ascending=[False, False]).reset_index(drop=True)
+    df["rank"] = np.arange(1, len(df) + 1)
+    return df
+
+
+def compute_portfolio_credibility(persist: bool = True):
+    """
+    Score every SHG in one pass. Returns a ranked DataFrame with score,
+    balance and recommendation code; optionally stores it in shg_credibility
+    for the other engines.
+    """
+    conn = get_connection()
+    df = pd.read_sql_query(PORTFOLIO_SQL, conn)
+    conn.close()
+
+    if df.empty:
+        return df
+
+    ranked = score_portfolio(df)
+
+    if persist:
+        with transaction() as conn:
+            conn.execute("DELETE FROM shg_credibility;")
+            insert_many(
+                "shg_credibility",
+                PERSISTED_COLUMNS,
+                ranked[PERSISTED_COLUMNS].astype(object).to_dict(orient="records"),
+                extra={"scored_at": datetime.now().isoformat()},
+            )
+
+    return ranked
+
+
+def load_portfolio_credibility():
+    """Last persisted ranking (empty DataFrame if never computed)."""
+    conn = get_connection()
+    df = pd.read_sql_query(
+        """
+        SELECT c.*, g.name, g.district, g.state
+        FROM shg_credibility c
+        JOIN shg g ON g.id = c.shg_id
+        ORDER BY c.rank
+        """,
+        conn,
+    )
+    conn.close()
+    return df
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score and rank every SHG.")
+    parser.add_argument("--top", type=int, default=10, help="rows of the ranking to print")
+    parser.add_argument("--dry-run", action="store_true", help="do not write shg_credibility")
+    args = parser.parse_args()
+
+    ranked = compute_portfolio_credibility(persist=not args.dry_run)
+    if ranked.empty:
+        print("✔ No SHGs to score")
+    else:
+        print(ranked[["rank", "shg_id", "name", "score", "balance", "rec_code"]].head(args.top).to_string(index=False))
+        print(f"✔ Ranked {len(ranked)} SHGs" + ("" if args.dry_run else " into shg_credibility"))
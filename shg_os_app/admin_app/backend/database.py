@@ -1,135 +1,298 @@
 import sqlite3
+import threading
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
 from backend.safe_utils import safe_float
+from backend.migrations import apply_migrations
 
 
 DB_PATH = Path(__file__).resolve().parent.parent / "shg_os.db"
 
+# ---------- CONNECTION POOL SETTINGS ----------
+POOL_MAX_IDLE = 16           # idle connections kept around for reuse
+BUSY_TIMEOUT_MS = 5000       # wait this long on a locked DB before failing
+CACHE_SIZE_KIB = 16384       # page cache per connection (16 MB)
+MMAP_SIZE_BYTES = 268435456  # 256 MB memory-mapped reads
+
+CONNECTION_PRAGMAS = [
+    "PRAGMA journal_mode=WAL;",
+    "PRAGMA synchronous=NORMAL;",
+    f"PRAGMA cache_size=-{CACHE_SIZE_KIB};",
+    f"PRAGMA mmap_size={MMAP_SIZE_BYTES};",
+    "PRAGMA temp_store=MEMORY;",
+    f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS};",
+]
+
+
+class PooledConnection(sqlite3.Connection):
+    """
+    sqlite3 connection that goes back to the pool on close().
+    Still a real sqlite3.Connection, so pandas.read_sql_query accepts it.
+    """
+
+    pool = None
+
+    def close(self):
+        if self.pool is None:
+            super().close()
+        else:
+            self.pool.release(self)
+
+    def really_close(self):
+        super().close()
+
+
+class ConnectionPool:
+    """
+    Small LIFO pool of configured SQLite connections shared by all
+    Streamlit sessions in this process. Pragmas are applied once,
+    when a connection is first opened.
+    """
+
+    def __init__(self, db_path, max_idle=POOL_MAX_IDLE):
+        self.db_path = db_path
+        self.max_idle = max_idle
+        self._idle = []
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.discarded = 0
+
+    def _open(self):
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=BUSY_TIMEOUT_MS / 1000.0,
+            check_same_thread=False,
+            factory=PooledConnection,
+        )
+        conn.pool = self
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def acquire(self):
+        with self._lock:
+            if self._idle:
+                self.hits += 1
+                return self._idle.pop()
+            self.misses += 1
+        return self._open()
+
+    def release(self, conn):
+        # Same semantics as a real close(): uncommitted work is discarded
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.ProgrammingError:
+            return  # already closed for real
+
+        with self._lock:
+            if conn not in self._idle and len(self._idle) < self.max_idle:
+                self._idle.append(conn)
+                return
+            self.discarded += 1
+        conn.really_close()
+
+    def close_all(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.really_close()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "discarded": self.discarded,
+                "idle": len(self._idle),
+            }
+
+
+_pool = ConnectionPool(DB_PATH)
+
+
 def get_connection():
-    return sqlite3.connect(DB_PATH, check_same_thread=False)
+    """
+    Returns a pooled connection. Callers keep using conn.close();
+    that hands the connection back to the pool instead of closing it.
+    The first call in a process also applies pending schema migrations.
+    """
+    if not _schema_ready:
+        init_db()
+    return _pool.acquire()
+
+
+def get_pool_stats():
+    return _pool.stats()
+
+
+# ---------- UNIT OF WORK ----------
+_local = threading.local()
+
+
+@contextmanager
+def transaction():
+    """
+    Unit of work: everything inside the block runs on one connection as a
+    single BEGIN IMMEDIATE ... COMMIT, and is rolled back on any error.
+
+    Nested transaction() blocks join the outer one, so ops functions that
+    open their own transaction can be combined by the caller:
+
+        with transaction():
+            update_inventory(product_id, -qty)
+            add_transaction(...)
+
+    Don't call st.rerun() / st.stop() inside the block — they raise, which
+    rolls the work back.
+    """
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        yield conn
+        return
 
-def init_db():
     conn = get_connection()
-    cur = conn.cursor()
-
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS shg (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL,
-            village TEXT,
-            district TEXT,
-            state TEXT,
-            created_at TEXT
-        );
-    """)
-
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS member (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            shg_id INTEGER,
-            name TEXT NOT NULL,
-            phone TEXT,
-            role TEXT,
-            joined_at TEXT,
-            FOREIGN KEY (shg_id) REFERENCES shg(id)
-        );
-    """)
-
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS product (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            shg_id INTEGER,
-            name TEXT NOT NULL,
-            category TEXT,
-            unit TEXT,
-            cost_price REAL,
-            selling_price REAL,
-            created_at TEXT,
-            FOREIGN KEY (shg_id) REFERENCES shg(id)
-        );
-    """)
-
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS inventory (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            product_id INTEGER,
-            quantity REAL,
-            updated_at TEXT,
-            FOREIGN KEY (product_id) REFERENCES product(id)
-        );
-    """)
-
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS tx (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            shg_id INTEGER,
-            member_id INTEGER,
-            product_id INTEGER,
-            tx_date TEXT,
-            quantity REAL,
-            amount REAL,
-            tx_type TEXT,
-            description TEXT,
-            FOREIGN KEY (shg_id) REFERENCES shg(id),
-            FOREIGN KEY (member_id) REFERENCES member(id),
-            FOREIGN KEY (product_id) REFERENCES product(id)
-        );
-    """)
-
-        # Member skills (what each person actually does)
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS member_skills (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            member_id INTEGER,
-            skill_category TEXT,
-            sub_skill TEXT,
-            years_experience REAL,
-            FOREIGN KEY (member_id) REFERENCES member(id)
-        );
-    """)
-
-    # Member financial profile
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS member_financials (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            member_id INTEGER,
-            monthly_income REAL,
-            monthly_expense REAL,
-            credit_outstanding REAL,
-            loan_repayment_rate REAL,
-            savings REAL,
-            last_updated TEXT,
-            FOREIGN KEY (member_id) REFERENCES member(id)
-        );
-    """)
-
-    # SHG production capacity
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS shg_production (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            shg_id INTEGER,
-            product_name TEXT,
-            monthly_capacity REAL,
-            supply_ready REAL,
-            FOREIGN KEY (shg_id) REFERENCES shg(id)
-        );
-    """)
-
-    # External demand centers
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS demand_centers (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            location TEXT,
-            district TEXT,
-            state TEXT,
-            product_required TEXT,
-            quantity_required REAL,
-            deadline TEXT,
-            created_at TEXT
-        );
-    """)
-
-
-    conn.commit()
-    conn.close()
\ No newline at end of file
+    try:
+        # Inside the try: under contention BEGIN IMMEDIATE can fail with
+        # "database is locked" after busy_timeout, and the connection must
+        # still go back to the pool
+        conn.execute("BEGIN IMMEDIATE;")
+    except BaseException:
+        conn.close()
+        raise
+
+    _local.conn = conn
+    try:
+        yield conn
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        _local.conn = None
+        conn.close()
+
+
+_schema_lock = threading.Lock()
+_schema_ready = False
+
+
+def init_db():
+    """
+    Bring the schema up to date, once per process. Later calls return
+    immediately, so pages never pay for DDL or commits on rerun.
+    """
+    global _schema_ready
+    if _schema_ready:
+        return
+
+    with _schema_lock:
+        if _schema_ready:
+            return
+        conn = _pool.acquire()
+        try:
+            apply_migrations(conn)
+        finally:
+            conn.close()
+        _schema_ready = True
+
+
+# ---------- BULK WRITES ----------
+_table_info = {}   # table -> {column: required}, filled on first insert
+
+
+def _table_columns(conn, table):
+    """{column: required} for a table; required = NOT NULL without a default."""
+    if table not in _table_info:
+        rows = conn.execute(f"PRAGMA table_info({table});").fetchall()
+        if not rows:
+            raise ValueError(f"Unknown table: {table}")
+        # (cid, name, type, notnull, dflt_value, pk)
+        _table_info[table] = {
+            name: bool(notnull) and dflt is None and not pk
+            for _, name, _, notnull, dflt, pk in rows
+        }
+    return _table_info[table]
+
+
+def _as_rows(records, columns):
+    """
+    Normalise a DataFrame, an iterable of dicts, or an iterable of tuples
+    (already in column order) into a list of tuples. DataFrames must carry
+    every column; dicts may leave out optional ones (inserted as NULL).
+    """
+    if hasattr(records, "to_dict"):  # pandas DataFrame
+        missing = [c for c in columns if c not in records.columns]
+        if missing:
+            raise ValueError(f"DataFrame is missing columns: {', '.join(missing)}")
+        unknown = [c for c in records.columns if c not in columns]
+        if unknown:
+            raise ValueError(f"Unexpected DataFrame columns: {', '.join(map(str, unknown))}")
+        records = records.to_dict(orient="records")
+
+    rows = []
+    for r in records:
+        if isinstance(r, dict):
+            unknown = set(r) - set(columns)
+            if unknown:
+                raise ValueError(f"Unexpected fields: {', '.join(sorted(unknown))}")
+            rows.append(tuple(r.get(c) for c in columns))
+        else:
+            r = tuple(r)
+            if len(r) != len(columns):
+                raise ValueError(f"Expected {len(columns)} values per row, got {len(r)}")
+            rows.append(r)
+    return rows
+
+
+def insert_many(table, columns, records, extra=None):
+    """
+    Insert many rows with one executemany inside a single unit of work.
+    `extra` is a {column: value} dict appended to every row (e.g. a
+    created_at timestamp). Returns the new row ids in input order.
+
+    Columns are checked against the table: unknown columns, and required
+    (NOT NULL, no default) columns that are left out or None, raise
+    ValueError before anything is written.
+
+    Ids are read back from last_insert_rowid(): the rows are written
+    back-to-back under BEGIN IMMEDIATE's write lock into a rowid table
+    with no explicit id given, so SQLite hands out a contiguous block.
+    That is why `id` itself cannot be passed in `columns`.
+    """
+    extra = extra or {}
+    all_columns = list(columns) + list(extra)
+    if "id" in all_columns:
+        raise ValueError("insert_many assigns ids itself; leave out the id column")
+
+    rows = _as_rows(records, columns)
+    if not rows:
+        return []
+
+    if extra:
+        tail = tuple(extra.values())
+        rows = [row + tail for row in rows]
+
+    placeholders = ", ".join("?" for _ in all_columns)
+    sql = f"INSERT INTO {table} ({', '.join(all_columns)}) VALUES ({placeholders})"
+
+    with transaction() as conn:
+        table_columns = _table_columns(conn, table)
+        unknown = [c for c in all_columns if c not in table_columns]
+        if unknown:
+            raise ValueError(f"{table} has no column(s): {', '.join(unknown)}")
+        required = [c for c, req in table_columns.items() if req]
+        missing = [c for c in required if c not in all_columns]
+        if missing:
+            raise ValueError(f"{table} requires column(s): {', '.join(missing)}")
+        for c in required:
+            i = all_columns.index(c)
+            if any(row[i] is None for row in rows):
+                raise ValueError(f"{table}.{c} cannot be empty")
+
+        conn.executemany(sql, rows)
+        last_id = conn.execute("SELECT last_insert_rowid();").fetchone()[0]
+
+    return list(range(last_id - len(rows) + 1, last_id + 1))
@@ -1,5 +1,5 @@
 from datetime import datetime
-from .database import get_connection
+from .database import get_connection, insert_many
 
 def add_demand(location, district, state, product_required, quantity_required, deadline):
     conn = get_connection()
@@ -23,6 +23,19 @@ def add_demand(location, district, state, product_required, quantity_required, d
     conn.commit()
     conn.close()
 
+def add_demands(records):
+    """
+    Bulk version of add_demand. records: DataFrame / dicts with location,
+    district, state, product_required, quantity_required, deadline — or
+    tuples in that order. Returns the new demand_centers ids.
+    """
+    return insert_many(
+        "demand_centers",
+        ["location", "district", "state", "product_required", "quantity_required", "deadline"],
+        records,
+        extra={"created_at": datetime.now().isoformat()},
+    )
+
 def get_all_demand():
     conn = get_connection()
     cur = conn.cursor()
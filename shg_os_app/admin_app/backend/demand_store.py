@@ -0,0 +1,134 @@
+"""
+District demand reference data.
+
+india_district_demand_large.csv is ingested into the district_demand
+table (primary key state, district, skill_category) so the geo engines
+and pages read it with an indexed query instead of parsing the CSV, by
+a CWD-relative path, on every call. An empty table is seeded from the
+bundled CSV on first use.
+
+Refresh after replacing the CSV, from admin_app/:
+    python -m backend.demand_store
+    python -m backend.demand_store --csv /path/to/new_demand.csv --append
+"""
+import argparse
+import threading
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from backend.database import get_connection, transaction
+
+
+DEMAND_CSV = Path(__file__).resolve().parent.parent / "india_district_demand_large.csv"
+
+DEMAND_COLUMNS = [
+    "state",
+    "district",
+    "skill_category",
+    "latitude",
+    "longitude",
+    "monthly_demand",
+    "priority_level",
+]
+
+_seed_lock = threading.Lock()
+_seeded = False
+
+
+def load_demand_csv(path=DEMAND_CSV, replace=True):
+    """
+    Ingest a demand CSV. With replace, the table is swapped atomically;
+    otherwise rows are upserted on (state, district, skill_category).
+    Returns the number of rows written.
+    """
+    df = pd.read_csv(path)
+    missing = [c for c in DEMAND_COLUMNS if c not in df.columns]
+    if missing:
+        raise ValueError(f"Demand CSV is missing columns: {', '.join(missing)}")
+
+    df = df[DEMAND_COLUMNS].dropna(subset=["state", "district", "skill_category"])
+    for col in ["state", "district", "skill_category"]:
+        df[col] = df[col].astype(str).str.strip()
+    for col in ["latitude", "longitude", "monthly_demand", "priority_level"]:
+        df[col] = pd.to_numeric(df[col], errors="coerce")
+    # one row per key; the last occurrence in the file wins
+    df = df.drop_duplicates(subset=["state", "district", "skill_category"], keep="last")
+
+    now = datetime.now().isoformat()
+    records = df.astype(object).where(df.notna(), None)
+    rows = [row + (now,) for row in records.itertuples(index=False, name=None)]
+
+    with transaction() as conn:
+        if replace:
+            conn.execute("DELETE FROM district_demand;")
+        conn.executemany(
+            f"""
+            INSERT INTO district_demand ({', '.join(DEMAND_COLUMNS)}, loaded_at)
+            VALUES ({', '.join('?' for _ in DEMAND_COLUMNS)}, ?)
+            ON CONFLICT(state, district, skill_category) DO UPDATE SET
+                latitude = excluded.latitude,
+                longitude = excluded.longitude,
+                monthly_demand = excluded.monthly_demand,
+                priority_level = excluded.priority_level,
+                loaded_at = excluded.loaded_at;
+            """,
+            rows,
+        )
+    return len(rows)
+
+
+def ensure_demand_loaded():
+    """Seed district_demand from the bundled CSV if it is still empty."""
+    global _seeded
+    if _seeded:
+        return
+    with _seed_lock:
+        if _seeded:
+            return
+        conn = get_connection()
+        has_rows = conn.execute("SELECT 1 FROM district_demand LIMIT 1;").fetchone()
+        conn.close()
+        if not has_rows and DEMAND_CSV.exists():
+            load_demand_csv(DEMAND_CSV)
+        _seeded = True
+
+
+def get_district_demand(skill_category=None):
+    """Demand rows (optionally for one skill) as a DataFrame in DEMAND_COLUMNS order."""
+    ensure_demand_loaded()
+    sql = f"SELECT {', '.join(DEMAND_COLUMNS)} FROM district_demand"
+    params = ()
+    if skill_category is None:
+        sql += " ORDER BY skill_category, state, district;"
+    else:
+        sql += " WHERE skill_category = ? ORDER BY state, district;"
+        params = (skill_category,)
+
+    conn = get_connection()
+    df = pd.read_sql_query(sql, conn, params=params)
+    conn.close()
+    return df
+
+
+def get_demand_skills():
+    """Distinct skill categories with demand data (index-only scan)."""
+    ensure_demand_loaded()
+    conn = get_connection()
+    rows = conn.execute(
+        "SELECT DISTINCT skill_category FROM district_demand ORDER BY skill_category;"
+    ).fetchall()
+    conn.close()
+    return [r[0] for r in rows]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load district demand data into shg_os.db.")
+    parser.add_argument("--csv", type=Path, default=DEMAND_CSV)
+    parser.add_argument("--append", action="store_true",
+                        help="upsert into the existing rows instead of replacing them")
+    args = parser.parse_args()
+
+    n = load_demand_csv(args.csv, replace=not args.append)
+    print(f"✔ Loaded {n} district demand rows from {args.csv}")
@@ -1,6 +1,12 @@
+import numpy as np
 import pandas as pd
 from backend.safe_utils import safe_float, safe_int
 from backend.database import get_connection
+from backend.spatial_index import get_shg_index, locate_district
+
+
+# SHGs further than this from the demand district get no location points
+DEPLOY_RADIUS_KM = 300
 
 
 def load_shg_supply_data():
@@ -86,8 +92,12 @@ def compute_match_score(product_required, qty_required, shg_row):
         score += 2
 
     # 5. Location match (5 points)
-    # Boost if district/state matches
-    if shg_row["district_match"] == 1:
+    # Scaled by distance when both ends have coordinates,
+    # otherwise a boost if district/state matches
+    distance = shg_row.get("distance_km", np.nan)
+    if pd.notna(distance):
+        score += 5 * max(0.0, 1 - distance / DEPLOY_RADIUS_KM)
+    elif shg_row["district_match"] == 1:
         score += 5
     elif shg_row["state_match"] == 1:
         score += 3
@@ -112,6 +122,19 @@ def match_shgs_to_demand(location, district, state, product_required, qty_requir
     df["district_match"] = (df["district"].str.lower() == district.lower()).astype(int)
     df["state_match"] = (df["state"].str.lower() == state.lower()).astype(int)
 
+    # Distance to the demand district via the SHG spatial index (radius
+    # query); located SHGs outside the radius are at "infinite" distance
+    df["distance_km"] = np.nan
+    point = locate_district(district, state) if district else None
+    if point is not None:
+        shg_index = get_shg_index()
+        nearby = shg_index.within(point[0], point[1], DEPLOY_RADIUS_KM)
+        located = df["shg_id"].isin(shg_index.points["shg_id"])
+        df.loc[located, "distance_km"] = np.inf
+        df["distance_km"] = df["shg_id"].map(
+            nearby.set_index("shg_id")["distance_km"]
+        ).fillna(df["distance_km"])
+
     # Filter only SHGs who produce this product
     df = df[df["product_name"].str.lower() == product_required.lower()]
 
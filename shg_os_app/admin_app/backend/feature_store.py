@@ -0,0 +1,179 @@
+"""
+In-process SHG feature store.
+
+load_shg_feature_matrix() used to rebuild the per-SHG feature table
+(four full-table reads + groupbys) for every caller — clustering, health,
+insights — often several times per page or AI question. The store builds
+it once per data version and hands out copies of the cached frame.
+
+The data version is the tuple of counters in table_data_version for the
+source tables, bumped by triggers on every insert / update / delete.
+"""
+import threading
+
+import pandas as pd
+
+from backend.database import get_connection
+
+
+FEATURE_TABLES = ("shg", "member", "member_skills", "member_financials", "shg_production")
+
+# Numeric columns of the matrix that the clustering models are fitted on
+NUMERIC_FEATURES = [
+    "avg_income",
+    "avg_savings",
+    "avg_experience",
+    "total_capacity",
+    "total_supply_ready",
+]
+
+_lock = threading.Lock()
+_cached_version = None
+_cached_matrix = None
+
+
+def get_data_version(tables=FEATURE_TABLES):
+    """Tuple of change counters for the given tables (one small PK read)."""
+    placeholders = ", ".join("?" for _ in tables)
+    conn = get_connection()
+    rows = dict(conn.execute(
+        f"SELECT table_name, version FROM table_data_version WHERE table_name IN ({placeholders});",
+        list(tables),
+    ).fetchall())
+    conn.close()
+    return tuple(rows.get(t, 0) for t in tables)
+
+
+# One statement: per-SHG aggregates plus the dominant skill, picked with
+# ROW_NUMBER() over per-skill member counts (ties go to the skill recorded
+# first, like value_counts().idxmax()). {scope} optionally restricts the
+# SHGs aggregated, so single-SHG lookups stay index-driven.
+FEATURE_MATRIX_SQL = """
+    WITH scope AS (
+        SELECT id FROM shg {scope}
+    ),
+    skill_counts AS (
+        SELECT m.shg_id,
+               s.skill_category,
+               COUNT(*) AS n,
+               MIN(s.id) AS first_seen
+        FROM member m
+        JOIN scope ON scope.id = m.shg_id
+        JOIN member_skills s ON m.id = s.member_id
+        WHERE s.skill_category IS NOT NULL
+        GROUP BY m.shg_id, s.skill_category
+    ),
+    dominant AS (
+        SELECT shg_id, skill_category
+        FROM (
+            SELECT shg_id,
+                   skill_category,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY shg_id ORDER BY n DESC, first_seen ASC
+                   ) AS rn
+            FROM skill_counts
+        )
+        WHERE rn = 1
+    ),
+    experience AS (
+        SELECT m.shg_id, AVG(s.years_experience) AS avg_experience
+        FROM member m
+        JOIN scope ON scope.id = m.shg_id
+        JOIN member_skills s ON m.id = s.member_id
+        GROUP BY m.shg_id
+    ),
+    financials AS (
+        SELECT m.shg_id,
+               AVG(f.monthly_income) AS avg_income,
+               AVG(f.monthly_expense) AS avg_expense,
+               AVG(f.savings) AS avg_savings
+        FROM member m
+        JOIN scope ON scope.id = m.shg_id
+        JOIN member_financials f ON m.id = f.member_id
+        GROUP BY m.shg_id
+    ),
+    capacity AS (
+        SELECT p.shg_id,
+               SUM(p.monthly_capacity) AS total_capacity,
+               SUM(p.supply_ready) AS total_supply_ready
+        FROM shg_production p
+        JOIN scope ON scope.id = p.shg_id
+        GROUP BY p.shg_id
+    )
+    SELECT g.id AS shg_id,
+           g.name,
+           g.village,
+           g.district,
+           g.state,
+           COALESCE(d.skill_category, 'Unknown') AS dominant_skill,
+           COALESCE(e.avg_experience, 0.0) AS avg_experience,
+           COALESCE(f.avg_income, 0.0) AS avg_income,
+           COALESCE(f.avg_expense, 0.0) AS avg_expense,
+           COALESCE(f.avg_savings, 0.0) AS avg_savings,
+           COALESCE(c.total_capacity, 0.0) AS total_capacity,
+           COALESCE(c.total_supply_ready, 0.0) AS total_supply_ready
+    FROM shg g
+    JOIN scope ON scope.id = g.id
+    LEFT JOIN dominant d ON d.shg_id = g.id
+    LEFT JOIN experience e ON e.shg_id = g.id
+    LEFT JOIN financials f ON f.shg_id = g.id
+    LEFT JOIN capacity c ON c.shg_id = g.id
+    ORDER BY g.id;
+"""
+
+
+def build_shg_feature_matrix(shg_ids=None):
+    """
+    Build a feature table per SHG:
+    - dominant skill
+    - avg member income
+    - avg savings
+    - avg years of experience
+    - total monthly capacity
+    - total supply ready
+
+    All aggregation runs inside SQLite; pandas only receives one row per SHG.
+    Pass shg_ids to build the rows of just those SHGs (bypasses the cache).
+    """
+    if shg_ids is None:
+        sql, params = FEATURE_MATRIX_SQL.format(scope=""), ()
+    else:
+        shg_ids = [int(i) for i in shg_ids]
+        placeholders = ", ".join("?" for _ in shg_ids)
+        sql = FEATURE_MATRIX_SQL.format(scope=f"WHERE id IN ({placeholders})")
+        params = tuple(shg_ids)
+
+    conn = get_connection()
+    features = pd.read_sql_query(sql, conn, params=params)
+    conn.close()
+
+    if features.empty:
+        return pd.DataFrame()
+
+    return features
+
+
+def get_shg_feature_matrix():
+    """
+    Returns the feature matrix for the current data version.
+
+    The result is a deep copy of the cached frame, so callers may modify
+    it freely (.loc assignment, inplace fillna, ...) without touching
+    other sessions. Copying a few thousand rows costs far less than
+    rebuilding the matrix.
+    """
+    global _cached_version, _cached_matrix
+
+    version = get_data_version()
+    with _lock:
+        if _cached_matrix is None or _cached_version != version:
+            _cached_matrix = build_shg_feature_matrix()
+            _cached_version = version
+        return _cached_matrix.copy()
+
+
+def invalidate():
+    global _cached_version, _cached_matrix
+    with _lock:
+        _cached_version = None
+        _cached_matrix = None
@@ -0,0 +1,222 @@
+"""
+Materialized geo clustering results.
+
+compute_geo_demand_clusters rebuilds the geo features and runs a 10-init
+KMeans per call. This job runs it ahead of time for every skill category
+(plus the all-skills run) and every requested k, and stores the cluster
+assignments and summaries in geo_cluster_run / _assignment / _summary,
+keyed by the data version of the source tables. The geo pages only read
+finished runs.
+
+Run from admin_app/ (e.g. from cron after data imports):
+    python -m backend.geo_cluster_store --k 4 6 8
+"""
+import argparse
+import json
+from datetime import datetime
+
+import pandas as pd
+
+from backend.database import get_connection, transaction
+from backend.demand_store import ensure_demand_loaded
+from backend.feature_store import get_data_version
+from backend.geo_clustering_engine import compute_geo_demand_clusters, load_shg_geo_product_features
+from backend.geocoder import ensure_shg_locations
+
+
+# Tables whose changes make a stored run stale
+GEO_TABLES = ("shg", "member", "member_skills", "shg_production", "district_demand", "shg_location")
+
+DEFAULT_KS = (4, 6, 8)
+
+ASSIGNMENT_COLUMNS = [
+    "shg_id",
+    "cluster_label",
+    "name",
+    "district",
+    "state",
+    "skill_category",
+    "latitude",
+    "longitude",
+    "total_capacity",
+    "monthly_demand",
+    "nearby_demand",
+    "demand_gap",
+]
+
+SUMMARY_COLUMNS = [
+    "cluster_label",
+    "num_shgs",
+    "states",
+    "top_skill",
+    "avg_capacity",
+    "avg_demand",
+    "avg_gap",
+]
+
+
+def current_data_version():
+    """Data version of the geo source tables. Read-only; see settle_sources()."""
+    return json.dumps(list(get_data_version(GEO_TABLES)))
+
+
+def settle_sources():
+    """
+    Seed district_demand and geocode new SHGs before a run. Both write to
+    the versioned tables, so doing it mid-run would make the run stale at
+    once. Only the materialization job calls this, never the read path.
+    """
+    ensure_demand_loaded()
+    ensure_shg_locations()
+
+
+def _rows(df, columns):
+    records = df[columns].astype(object).where(df[columns].notna(), None)
+    return list(records.itertuples(index=False, name=None))
+
+
+def _store_run(skill_category, k, data_version, feats, summary):
+    skill_key = skill_category or ""
+    with transaction() as conn:
+        # Older runs for this (skill, k) are superseded
+        old_ids = [r[0] for r in conn.execute(
+            "SELECT run_id FROM geo_cluster_run WHERE skill_category = ? AND k = ?;",
+            (skill_key, k),
+        )]
+        for run_id in old_ids:
+            conn.execute("DELETE FROM geo_cluster_assignment WHERE run_id = ?;", (run_id,))
+            conn.execute("DELETE FROM geo_cluster_summary WHERE run_id = ?;", (run_id,))
+            conn.execute("DELETE FROM geo_cluster_run WHERE run_id = ?;", (run_id,))
+
+        run_id = conn.execute(
+            """
+            INSERT INTO geo_cluster_run (skill_category, k, data_version, num_shgs, computed_at)
+            VALUES (?, ?, ?, ?, ?);
+            """,
+            (skill_key, k, data_version, len(feats), datetime.now().isoformat()),
+        ).lastrowid
+
+        if not feats.empty:
+            conn.executemany(
+                f"""
+                INSERT INTO geo_cluster_assignment (run_id, {', '.join(ASSIGNMENT_COLUMNS)})
+                VALUES (?, {', '.join('?' for _ in ASSIGNMENT_COLUMNS)});
+                """,
+                [(run_id,) + row for row in _rows(feats, ASSIGNMENT_COLUMNS)],
+            )
+            conn.executemany(
+                f"""
+                INSERT INTO geo_cluster_summary (run_id, {', '.join(SUMMARY_COLUMNS)})
+                VALUES (?, {', '.join('?' for _ in SUMMARY_COLUMNS)});
+                """,
+                [(run_id,) + row for row in _rows(summary, SUMMARY_COLUMNS)],
+            )
+    return run_id
+
+
+def _existing_runs(data_version):
+    conn = get_connection()
+    rows = conn.execute(
+        "SELECT skill_category, k FROM geo_cluster_run WHERE data_version = ?;",
+        (data_version,),
+    ).fetchall()
+    conn.close()
+    return {(skill, k) for skill, k in rows}
+
+
+def precompute_geo_clusters(ks=DEFAULT_KS, skills=None, force=False):
+    """
+    Materialize every (skill, k) run missing for the current data version.
+    skills defaults to the all-skills run plus each dominant skill present.
+    Returns the number of runs computed.
+    """
+    settle_sources()
+    data_version = current_data_version()
+    done = set() if force else _existing_runs(data_version)
+
+    features = load_shg_geo_product_features()
+    if skills is None:
+        skills = [None] + (
+            sorted(features["skill_category"].dropna().unique().tolist())
+            if not features.empty else []
+        )
+
+    computed = 0
+    for skill in skills:
+        for k in ks:
+            if (skill or "", k) in done:
+                continue
+            feats, summary = compute_geo_demand_clusters(k, skill_category=skill, features=features)
+            _store_run(skill, k, data_version, feats, summary)
+            computed += 1
+    return computed
+
+
+def load_geo_clusters(skill_category=None, k=6):
+    """
+    Latest stored run for (skill_category, k) as
+    (assignments, summary, info) with info = {"run_id", "computed_at",
+    "num_shgs", "stale"}; (None, None, None) if it was never computed.
+    stale is True when the source data changed after the run. Nothing is
+    written here: a newly added SHG shows up as stale until the next
+    precompute job geocodes it.
+    """
+    conn = get_connection()
+    run = conn.execute(
+        """
+        SELECT run_id, data_version, computed_at, num_shgs
+        FROM geo_cluster_run
+        WHERE skill_category = ? AND k = ?
+        ORDER BY run_id DESC LIMIT 1;
+        """,
+        (skill_category or "", k),
+    ).fetchone()
+    if run is None:
+        conn.close()
+        return None, None, None
+
+    run_id, data_version, computed_at, num_shgs = run
+    assignments = pd.read_sql_query(
+        f"SELECT {', '.join(ASSIGNMENT_COLUMNS)} FROM geo_cluster_assignment "
+        "WHERE run_id = ? ORDER BY cluster_label, shg_id;",
+        conn,
+        params=(run_id,),
+    )
+    summary = pd.read_sql_query(
+        f"SELECT {', '.join(SUMMARY_COLUMNS)} FROM geo_cluster_summary "
+        "WHERE run_id = ? ORDER BY cluster_label;",
+        conn,
+        params=(run_id,),
+    )
+    conn.close()
+
+    info = {
+        "run_id": run_id,
+        "computed_at": computed_at,
+        "num_shgs": num_shgs,
+        "stale": data_version != current_data_version(),
+    }
+    return assignments, summary, info
+
+
+def available_ks(skill_category=None):
+    conn = get_connection()
+    rows = conn.execute(
+        "SELECT DISTINCT k FROM geo_cluster_run WHERE skill_category = ? ORDER BY k;",
+        (skill_category or "",),
+    ).fetchall()
+    conn.close()
+    return [r[0] for r in rows]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precompute geo clustering results.")
+    parser.add_argument("--k", type=int, nargs="+", default=list(DEFAULT_KS))
+    parser.add_argument("--skill", action="append", default=None,
+                        help="limit to these skill categories (repeatable)")
+    parser.add_argument("--force", action="store_true",
+                        help="recompute even if results for this data version exist")
+    args = parser.parse_args()
+
+    n = precompute_geo_clusters(args.k, args.skill, args.force)
+    print(f"✔ Computed {n} geo cluster runs")
@@ -3,9 +3,15 @@ import numpy as np
 from sklearn.cluster import KMeans
 
 from backend.database import get_connection
+from backend.demand_store import get_district_demand
+from backend.spatial_index import get_demand_index, get_shg_index
 from backend.safe_utils import safe_float
 
 
+# Radius for the "demand for my skill nearby" feature
+DEMAND_RADIUS_KM = 150
+
+
 def load_shg_geo_product_features():
     """
     Build a per-SHG feature table combining:
@@ -13,7 +19,8 @@ def load_shg_geo_product_features():
     - dominant skill (skill_category)
     - capacity & supply
     - district-level demand for that skill
-    - latitude/longitude from india_district_demand_large.csv
+    - latitude/longitude of the SHG from shg_location (see geocoder)
+    - nearby_demand: demand for that skill within DEMAND_RADIUS_KM
     """
     conn = get_connection()
 
@@ -71,22 +78,43 @@ def load_shg_geo_product_features():
         .reset_index()
     )
 
-    # Load India-wide district demand data
-    demand_df = pd.read_csv("india_district_demand_large.csv")
+    # India-wide district demand data (indexed table, see demand_store)
+    demand_df = get_district_demand()
 
-    # Join on (state, district, skill_category)
+    # Join on (state, district, skill_category); coordinates come from
+    # the SHG's own geocoded location, not the demand row
     features = features.merge(
-        demand_df,
+        demand_df.drop(columns=["latitude", "longitude"]),
         on=["state", "district", "skill_category"],
         how="left",
     )
 
-    # Fill missing demand + coordinates with defaults
-    for col in ["monthly_demand", "priority_level", "latitude", "longitude"]:
+    shg_points = get_shg_index().points.set_index("shg_id")
+    for col in ["latitude", "longitude"]:
+        features[col] = features["shg_id"].map(shg_points[col])
+
+    # Demand for the SHG's skill within DEMAND_RADIUS_KM: one BallTree
+    # radius query per skill instead of a scan over the demand grid
+    features["nearby_demand"] = 0.0
+    located = features[features["latitude"].notna() & features["skill_category"].notna()]
+    for skill, group in located.groupby("skill_category"):
+        index = get_demand_index(skill)
+        idx, _ = index.within_many(group["latitude"], group["longitude"], DEMAND_RADIUS_KM)
+        demand = index.points["monthly_demand"].to_numpy(dtype=float)
+        features.loc[group.index, "nearby_demand"] = [float(demand[i].sum()) for i in idx]
+
+    # Fill missing demand with defaults
+    for col in ["monthly_demand", "priority_level"]:
         if col not in features.columns:
             features[col] = 0.0
         features[col] = features[col].fillna(0.0)
 
+    # The few SHGs the geocoder could not place sit at the median location
+    # rather than (0, 0), which would dominate the geographic distance
+    for col in ["latitude", "longitude"]:
+        median = features[col].median()
+        features[col] = features[col].fillna(0.0 if pd.isna(median) else median)
+
     # Ensure numeric
     features["total_capacity"] = features["total_capacity"].apply(safe_float)
     features["monthly_demand"] = features["monthly_demand"].apply(safe_float)
@@ -98,20 +126,26 @@ def load_shg_geo_product_features():
     return features
 
 
-def compute_geo_demand_clusters(n_clusters: int = 6):
+def compute_geo_demand_clusters(n_clusters: int = 6, skill_category=None, features=None):
     """
     Cluster SHGs by:
     - geography (latitude, longitude)
     - production capacity
-    - local demand for their skill
+    - local demand for their skill (district and within DEMAND_RADIUS_KM)
     - demand gap
+
+    skill_category restricts the run to SHGs with that dominant skill.
+    Pass prebuilt `features` (load_shg_geo_product_features) to reuse
+    them across several runs.
     """
-    feats = load_shg_geo_product_features()
+    feats = load_shg_geo_product_features() if features is None else features.copy()
+    if skill_category is not None and not feats.empty:
+        feats = feats[feats["skill_category"] == skill_category].reset_index(drop=True)
     if feats.empty:
         return feats, pd.DataFrame()
 
     # Build feature matrix
-    cols = ["latitude", "longitude", "total_capacity", "monthly_demand", "demand_gap"]
+    cols = ["latitude", "longitude", "total_capacity", "monthly_demand", "nearby_demand", "demand_gap"]
     X = feats[cols].astype(float).values
 
     # Simple normalization
@@ -0,0 +1,231 @@
+"""
+Simplified, pre-serialized district boundaries for the geo map.
+
+The build step simplifies every ring of data/india_districts.geojson with
+Douglas-Peucker at several tolerances and writes all levels into one
+compressed .npz under data/geo_cache/, named after the source file's
+content hash:
+
+  - coordinates quantized to 1e-5 degrees (~1 m) as int32
+  - ring / polygon / feature offsets, per-feature bounding boxes
+  - feature properties as one JSON blob
+
+get_geojson(zoom, bounds) then serves the coarsest level that still
+looks exact at that zoom, restricted to features intersecting the view.
+A stale or missing cache is rebuilt on first use.
+
+Build ahead of time, from admin_app/:
+    python -m backend.geo_tiles
+"""
+import argparse
+import hashlib
+import json
+import threading
+from pathlib import Path
+
+import numpy as np
+
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+SOURCE_GEOJSON = DATA_DIR / "india_districts.geojson"
+CACHE_DIR = DATA_DIR / "geo_cache"
+
+# Douglas-Peucker tolerances in degrees; level 0 keeps the full geometry
+TOLERANCES = (0.0, 0.002, 0.01, 0.03, 0.08)
+QUANTUM = 1e-5
+
+_lock = threading.Lock()
+_loaded = {}   # source hash -> dict of arrays
+_hash_memo = {}   # (path, mtime_ns, size) -> content hash
+
+
+def douglas_peucker(points, tolerance):
+    """Indices of the points of a polyline kept at `tolerance` (iterative DP)."""
+    n = len(points)
+    if tolerance <= 0 or n <= 2:
+        return np.arange(n)
+
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        seg = points[end] - points[start]
+        rel = points[start + 1:end] - points[start]
+        seg_len = np.hypot(*seg)
+        if seg_len == 0:
+            dist = np.hypot(rel[:, 0], rel[:, 1])
+        else:
+            dist = np.abs(seg[0] * rel[:, 1] - seg[1] * rel[:, 0]) / seg_len
+        i = int(dist.argmax())
+        if dist[i] > tolerance:
+            mid = start + 1 + i
+            keep[mid] = True
+            stack.append((start, mid))
+            stack.append((mid, end))
+    return np.flatnonzero(keep)
+
+
+def simplify_ring(ring, tolerance):
+    """Simplified closed ring; never fewer than 4 points (a triangle)."""
+    kept = ring[douglas_peucker(ring, tolerance)]
+    if len(kept) >= 4 or len(ring) < 4:
+        return kept
+    # Collapsed ring: fall back to evenly spaced points (first == last)
+    idx = np.linspace(0, len(ring) - 1, 4).round().astype(int)
+    return ring[idx]
+
+
+def source_hash(path=SOURCE_GEOJSON):
+    """Content hash of the source; only re-read when its mtime / size change."""
+    stat = Path(path).stat()
+    key = (str(path), stat.st_mtime_ns, stat.st_size)
+    if key not in _hash_memo:
+        _hash_memo[key] = hashlib.sha1(Path(path).read_bytes()).hexdigest()[:16]
+    return _hash_memo[key]
+
+
+def _cache_path(content_hash):
+    return CACHE_DIR / f"india_districts.{content_hash}.npz"
+
+
+def _polygons(geometry):
+    if geometry["type"] == "Polygon":
+        return [geometry["coordinates"]]
+    if geometry["type"] == "MultiPolygon":
+        return geometry["coordinates"]
+    return []
+
+
+def build_tile_cache(source=SOURCE_GEOJSON, tolerances=TOLERANCES):
+    """Simplify every level and write the .npz cache. Returns its path."""
+    content_hash = source_hash(source)
+    with open(source, "r") as f:
+        collection = json.load(f)
+
+    features = collection["features"]
+    properties = [feat.get("properties") or {} for feat in features]
+    multi = np.array([feat["geometry"]["type"] == "MultiPolygon" for feat in features])
+
+    rings, ring_polygon, polygon_feature, bboxes = [], [], [], []
+    for fi, feat in enumerate(features):
+        coords = []
+        for polygon in _polygons(feat["geometry"]):
+            for ring in polygon:
+                arr = np.asarray(ring, dtype=float)[:, :2]
+                rings.append(arr)
+                ring_polygon.append(len(polygon_feature))
+                coords.append(arr)
+            polygon_feature.append(fi)
+        allc = np.vstack(coords) if coords else np.zeros((1, 2))
+        bboxes.append([allc[:, 0].min(), allc[:, 1].min(), allc[:, 0].max(), allc[:, 1].max()])
+
+    arrays = {
+        "source_hash": np.array(content_hash),
+        "tolerances": np.array(tolerances, dtype=float),
+        "properties": np.frombuffer(json.dumps(properties).encode("utf-8"), dtype=np.uint8),
+        "multi": multi,
+        "bbox": np.array(bboxes, dtype=float),
+        "ring_polygon": np.array(ring_polygon, dtype=np.int32),
+        "polygon_feature": np.array(polygon_feature, dtype=np.int32),
+    }
+    for level, tol in enumerate(tolerances):
+        simplified = [simplify_ring(r, tol) for r in rings]
+        lengths = np.array([len(r) for r in simplified], dtype=np.int64)
+        arrays[f"offsets_{level}"] = np.concatenate([[0], np.cumsum(lengths)])
+        arrays[f"coords_{level}"] = (
+            np.round(np.vstack(simplified) / QUANTUM).astype(np.int32)
+            if simplified else np.zeros((0, 2), dtype=np.int32)
+        )
+
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    path = _cache_path(content_hash)
+    tmp = path.with_suffix(".tmp.npz")
+    np.savez_compressed(tmp, **arrays)
+    tmp.replace(path)
+    # Caches for older versions of the source are no longer needed
+    for old in CACHE_DIR.glob("india_districts.*.npz"):
+        if old != path:
+            old.unlink()
+    return path
+
+
+def load_tile_cache():
+    """Arrays of the cache matching the current source (built if missing)."""
+    content_hash = source_hash()
+    with _lock:
+        if content_hash in _loaded:
+            return _loaded[content_hash]
+        path = _cache_path(content_hash)
+        if not path.exists():
+            build_tile_cache()
+        with np.load(path) as npz:
+            cache = {name: npz[name] for name in npz.files}
+        cache["properties"] = json.loads(cache["properties"].tobytes().decode("utf-8"))
+        _loaded.clear()
+        _loaded[content_hash] = cache
+        return cache
+
+
+def level_for_zoom(zoom, tolerances=TOLERANCES):
+    """Coarsest level whose tolerance stays under ~1 screen pixel at `zoom`."""
+    pixel_deg = 360.0 / (256 * 2 ** float(zoom))
+    level = 0
+    for i, tol in enumerate(tolerances):
+        if tol <= pixel_deg:
+            level = i
+    return level
+
+
+def get_geojson(zoom=5, bounds=None):
+    """
+    FeatureCollection simplified for `zoom`. bounds = (south, west, north,
+    east) limits it to features whose bounding box intersects the view.
+    """
+    cache = load_tile_cache()
+    level = level_for_zoom(zoom, cache["tolerances"])
+    coords = cache[f"coords_{level}"] * QUANTUM
+    offsets = cache[f"offsets_{level}"]
+
+    visible = np.ones(len(cache["bbox"]), dtype=bool)
+    if bounds is not None:
+        south, west, north, east = bounds
+        bbox = cache["bbox"]
+        visible = (bbox[:, 0] <= east) & (bbox[:, 2] >= west) & (bbox[:, 1] <= north) & (bbox[:, 3] >= south)
+
+    polygons = {}
+    for ri, pi in enumerate(cache["ring_polygon"]):
+        if not visible[cache["polygon_feature"][pi]]:
+            continue
+        ring = np.round(coords[offsets[ri]:offsets[ri + 1]], 5).tolist()
+        polygons.setdefault(int(pi), []).append(ring)
+
+    by_feature = {}
+    for pi, rings in polygons.items():
+        by_feature.setdefault(int(cache["polygon_feature"][pi]), []).append(rings)
+
+    features = []
+    for fi, polys in sorted(by_feature.items()):
+        geometry = (
+            {"type": "MultiPolygon", "coordinates": polys}
+            if cache["multi"][fi]
+            else {"type": "Polygon", "coordinates": polys[0]}
+        )
+        features.append({"type": "Feature", "properties": cache["properties"][fi], "geometry": geometry})
+
+    return {"type": "FeatureCollection", "features": features}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the simplified district boundary cache.")
+    parser.add_argument("--source", type=Path, default=SOURCE_GEOJSON)
+    args = parser.parse_args()
+
+    path = build_tile_cache(args.source)
+    with np.load(path) as npz:
+        points = [len(npz[f"coords_{i}"]) for i in range(len(npz["tolerances"]))]
+    print(f"✔ Wrote {path.name} ({path.stat().st_size / 1024:.1f} KiB)")
+    for tol, n in zip(TOLERANCES, points):
+        print(f"  tolerance {tol:g}°: {n} points")
@@ -0,0 +1,273 @@
+"""
+Offline batch geocoder for SHGs.
+
+SHGs only carry free-text village / district / state. This module
+resolves them against the bundled gazetteer (data/india_gazetteer.csv:
+state and district centroids, optional village rows, "|"-separated
+aliases) with fuzzy name matching, most precise level first:
+
+    village in district  →  district in state  →  district in any state
+    →  state centroid  →  unresolved (NULL coordinates, never (0, 0))
+
+Every distinct query is cached in geocode_cache, tagged with the
+gazetteer's content hash, and per-SHG results live in shg_location.
+Only SHGs without a location row are geocoded; triggers drop the row
+when an SHG's address changes.
+
+Run from admin_app/ (after editing the gazetteer, use --force):
+    python -m backend.geocoder
+"""
+import argparse
+import csv
+import difflib
+import hashlib
+import re
+import threading
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+from backend.database import get_connection, transaction
+from backend.feature_store import get_data_version
+
+
+GAZETTEER_CSV = Path(__file__).resolve().parent.parent / "data" / "india_gazetteer.csv"
+
+# Minimum difflib similarity for a fuzzy name match
+MIN_MATCH_SCORE = 0.8
+
+# SQLite's default limit on host parameters per statement is 999
+ID_CHUNK = 900
+
+_gazetteer_lock = threading.Lock()
+_gazetteer = None
+_checked_version = None
+
+
+def normalize(name):
+    """Lower-case, punctuation-free, single-spaced name ('' for None)."""
+    name = re.sub(r"[^a-z0-9]+", " ", str(name or "").lower()).strip()
+    return re.sub(r"\s+(district|dist|rural|urban)$", "", name)
+
+
+def query_key(state, district, village=None):
+    return "|".join(normalize(v) for v in (state, district, village))
+
+
+def _best_match(name, candidates):
+    """(row, score) of the closest key in candidates, or (None, 0.0)."""
+    if not name or not candidates:
+        return None, 0.0
+    if name in candidates:
+        return candidates[name], 1.0
+    close = difflib.get_close_matches(name, candidates.keys(), n=1, cutoff=MIN_MATCH_SCORE)
+    if not close:
+        return None, 0.0
+    return candidates[close[0]], difflib.SequenceMatcher(None, name, close[0]).ratio()
+
+
+class Gazetteer:
+    def __init__(self, path=GAZETTEER_CSV):
+        raw = Path(path).read_bytes()
+        self.content_hash = hashlib.sha1(raw).hexdigest()[:16]
+
+        self.states = {}              # name -> row
+        self.districts = {}           # name -> row (any state)
+        self.districts_by_state = {}  # state key -> {name -> row}
+        self.villages = {}            # (state key, district key) -> {name -> row}
+
+        for row in csv.DictReader(raw.decode("utf-8").splitlines()):
+            row["latitude"] = float(row["latitude"])
+            row["longitude"] = float(row["longitude"])
+            names = [row["name"]] + [a for a in (row.get("aliases") or "").split("|") if a]
+            keys = {normalize(n) for n in names}
+
+            level = row["level"]
+            if level == "state":
+                target = self.states
+            elif level == "district":
+                target = self.districts_by_state.setdefault(normalize(row["state"]), {})
+                for key in keys:
+                    self.districts.setdefault(key, row)
+            else:
+                target = self.villages.setdefault(
+                    (normalize(row["state"]), normalize(row["district"])), {}
+                )
+            for key in keys:
+                target.setdefault(key, row)
+
+    def _result(self, row, precision, score):
+        matched = row["name"] if precision == "state" else f"{row['name']}, {row['state']}"
+        return {
+            "latitude": row["latitude"],
+            "longitude": row["longitude"],
+            "precision": precision,
+            "matched_name": matched,
+            "match_score": round(score, 3),
+        }
+
+    def resolve(self, state, district, village=None):
+        """Best coordinates for an address; precision 'unresolved' if nothing matched."""
+        state_row, state_score = _best_match(normalize(state), self.states)
+        state_key = normalize(state_row["name"]) if state_row else None
+
+        district_name = normalize(district)
+        district_row, district_score = None, 0.0
+        if district_name and state_key:
+            district_row, district_score = _best_match(
+                district_name, self.districts_by_state.get(state_key, {})
+            )
+        if district_row is not None:
+            villages = self.villages.get((state_key, normalize(district_row["district"])), {})
+            village_row, village_score = _best_match(normalize(village), villages)
+            if village_row is not None:
+                return self._result(village_row, "village", village_score)
+            return self._result(district_row, "district", district_score)
+
+        # District exists but under another state (inconsistent address)
+        district_row, district_score = _best_match(district_name, self.districts)
+        if district_row is not None:
+            return self._result(district_row, "district_any_state", district_score)
+
+        if state_row is not None:
+            return self._result(state_row, "state", state_score)
+
+        return {
+            "latitude": None,
+            "longitude": None,
+            "precision": "unresolved",
+            "matched_name": None,
+            "match_score": 0.0,
+        }
+
+
+def get_gazetteer():
+    global _gazetteer
+    with _gazetteer_lock:
+        if _gazetteer is None:
+            _gazetteer = Gazetteer()
+        return _gazetteer
+
+
+RESULT_COLUMNS = ["latitude", "longitude", "precision", "matched_name", "match_score"]
+
+
+def _resolve_keys(queries):
+    """
+    {query_key: result} for {query_key: (state, district, village)}:
+    cache hits first, the rest through the gazetteer (and into the cache).
+    """
+    gazetteer = get_gazetteer()
+    keys = list(queries)
+    resolved = {}
+
+    conn = get_connection()
+    for start in range(0, len(keys), ID_CHUNK):
+        chunk = keys[start:start + ID_CHUNK]
+        placeholders = ", ".join("?" for _ in chunk)
+        for row in conn.execute(
+            f"""
+            SELECT query_key, {', '.join(RESULT_COLUMNS)}
+            FROM geocode_cache
+            WHERE gazetteer_hash = ? AND query_key IN ({placeholders});
+            """,
+            [gazetteer.content_hash] + chunk,
+        ):
+            resolved[row[0]] = dict(zip(RESULT_COLUMNS, row[1:]))
+    conn.close()
+
+    misses = {k: gazetteer.resolve(*queries[k]) for k in keys if k not in resolved}
+    if misses:
+        now = datetime.now().isoformat()
+        with transaction() as conn:
+            conn.executemany(
+                f"""
+                INSERT OR REPLACE INTO geocode_cache
+                    (query_key, gazetteer_hash, {', '.join(RESULT_COLUMNS)}, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?);
+                """,
+                [
+                    (k, gazetteer.content_hash) + tuple(r[c] for c in RESULT_COLUMNS) + (now,)
+                    for k, r in misses.items()
+                ],
+            )
+        resolved.update(misses)
+    return resolved
+
+
+def geocode_place(state, district, village=None):
+    """Cached single lookup; returns the result dict (see Gazetteer.resolve)."""
+    key = query_key(state, district, village)
+    return _resolve_keys({key: (state, district, village)})[key]
+
+
+def geocode_shgs(shg_ids=None, force=False):
+    """
+    Geocode SHGs that have no shg_location row (all of them with force,
+    or just shg_ids). Returns a Counter of precision levels written.
+    """
+    sql = """
+        SELECT g.id, g.state, g.district, g.village
+        FROM shg g
+        LEFT JOIN shg_location l ON l.shg_id = g.id
+    """
+    conditions, params = [], []
+    if not force:
+        conditions.append("l.shg_id IS NULL")
+    if shg_ids is not None:
+        shg_ids = [int(i) for i in shg_ids]
+        if not shg_ids:
+            return Counter()
+        conditions.append(f"g.id IN ({', '.join('?' for _ in shg_ids)})")
+        params = shg_ids
+    if conditions:
+        sql += " WHERE " + " AND ".join(conditions)
+
+    conn = get_connection()
+    pending = conn.execute(sql + ";", params).fetchall()
+    conn.close()
+    if not pending:
+        return Counter()
+
+    queries = {}
+    shg_keys = []
+    for shg_id, state, district, village in pending:
+        key = query_key(state, district, village)
+        queries.setdefault(key, (state, district, village))
+        shg_keys.append((shg_id, key))
+    resolved = _resolve_keys(queries)
+
+    now = datetime.now().isoformat()
+    with transaction() as conn:
+        conn.executemany(
+            f"""
+            INSERT OR REPLACE INTO shg_location
+                (shg_id, query_key, {', '.join(RESULT_COLUMNS)}, geocoded_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?);
+            """,
+            [
+                (shg_id, key) + tuple(resolved[key][c] for c in RESULT_COLUMNS) + (now,)
+                for shg_id, key in shg_keys
+            ],
+        )
+    return Counter(resolved[key]["precision"] for _, key in shg_keys)
+
+
+def ensure_shg_locations():
+    """Geocode new SHGs; a no-op unless the shg table changed since the last check."""
+    global _checked_version
+    version = get_data_version(("shg",))
+    if version == _checked_version:
+        return
+    geocode_shgs()
+    _checked_version = version
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Geocode SHGs from the offline gazetteer.")
+    parser.add_argument("--force", action="store_true", help="re-geocode every SHG")
+    args = parser.parse_args()
+
+    counts = geocode_shgs(force=args.force)
+    total = sum(counts.values())
+    print(f"✔ Geocoded {total} SHGs" + (f": {dict(counts)}" if total else ""))
@@ -0,0 +1,154 @@
+"""
+Inventory ledger compaction.
+
+The inventory table is an append-only ledger: every adjustment or sale
+writes the product's new absolute stock level. This job keeps it small:
+
+1. For every product with ledger rows older than the retention window,
+   write a checkpoint row into inventory_snapshot at each interval
+   boundary (and at the cutoff itself).
+2. Move those old ledger rows into inventory_archive.
+
+get_inventory_as_of() answers "stock as of date X" from the hot ledger
+when it can, otherwise from the nearest snapshot plus the archived
+movements after it.
+
+Run from admin_app/:
+    python -m backend.inventory_compaction --retention-days 90 --interval-days 7
+"""
+import argparse
+from datetime import datetime, timedelta
+
+from backend.database import get_connection, transaction
+
+
+DEFAULT_RETENTION_DAYS = 90
+DEFAULT_INTERVAL_DAYS = 7
+
+
+def _level_at(conn, table, product_id, ts, after=None):
+    """Latest stock level recorded in `table` at or before ts (optionally after `after`)."""
+    sql = f"SELECT quantity, updated_at FROM {table} WHERE product_id = ? AND updated_at <= ?"
+    params = [product_id, ts]
+    if after is not None:
+        sql += " AND updated_at > ?"
+        params.append(after)
+    sql += " ORDER BY updated_at DESC, id DESC LIMIT 1;"
+    return conn.execute(sql, params).fetchone()
+
+
+def _snapshot_boundaries(first_ts, cutoff, interval_days):
+    """Midnight boundaries every interval_days from first_ts's day, plus the cutoff."""
+    start = datetime.fromisoformat(first_ts).replace(hour=0, minute=0, second=0, microsecond=0)
+    step = timedelta(days=interval_days)
+    boundaries = []
+    b = start + step
+    while b < cutoff:
+        boundaries.append(b.isoformat())
+        b += step
+    boundaries.append(cutoff.isoformat())
+    return boundaries
+
+
+def compact_product(product_id, cutoff, interval_days=DEFAULT_INTERVAL_DAYS):
+    """
+    Snapshot + archive one product's ledger rows older than cutoff.
+    Returns the number of ledger rows archived.
+    """
+    cutoff_ts = cutoff.isoformat()
+    now = datetime.now().isoformat()
+
+    with transaction() as conn:
+        first = conn.execute(
+            "SELECT MIN(updated_at) FROM inventory WHERE product_id = ? AND updated_at < ?;",
+            (product_id, cutoff_ts),
+        ).fetchone()[0]
+        if first is None:
+            return 0
+
+        for boundary in _snapshot_boundaries(first, cutoff, interval_days):
+            row = _level_at(conn, "inventory", product_id, boundary)
+            if row is None:
+                continue
+            conn.execute(
+                "INSERT OR REPLACE INTO inventory_snapshot "
+                "(product_id, quantity, as_of, created_at) VALUES (?, ?, ?, ?);",
+                (product_id, row[0], boundary, now),
+            )
+
+        conn.execute(
+            "INSERT OR REPLACE INTO inventory_archive (id, product_id, quantity, updated_at, archived_at) "
+            "SELECT id, product_id, quantity, updated_at, ? FROM inventory "
+            "WHERE product_id = ? AND updated_at < ?;",
+            (now, product_id, cutoff_ts),
+        )
+        cur = conn.execute(
+            "DELETE FROM inventory WHERE product_id = ? AND updated_at < ?;",
+            (product_id, cutoff_ts),
+        )
+        return cur.rowcount
+
+
+def compact_inventory_ledger(retention_days=DEFAULT_RETENTION_DAYS,
+                             interval_days=DEFAULT_INTERVAL_DAYS):
+    """
+    Compact every product's ledger. Each product is its own short
+    transaction, so the job never holds the write lock for long.
+    Returns {product_id: rows_archived} for products that had old rows.
+    """
+    cutoff = datetime.now() - timedelta(days=retention_days)
+
+    conn = get_connection()
+    product_ids = [
+        r[0] for r in conn.execute(
+            "SELECT DISTINCT product_id FROM inventory WHERE updated_at < ?;",
+            (cutoff.isoformat(),),
+        ).fetchall()
+    ]
+    conn.close()
+
+    archived = {}
+    for pid in product_ids:
+        n = compact_product(pid, cutoff, interval_days)
+        if n:
+            archived[pid] = n
+    return archived
+
+
+def get_inventory_as_of(product_id, as_of):
+    """
+    Stock level of a product at a point in time (datetime or ISO string).
+    Returns 0.0 if nothing was recorded before as_of.
+    """
+    ts = as_of.isoformat() if isinstance(as_of, datetime) else str(as_of)
+
+    conn = get_connection()
+    try:
+        row = _level_at(conn, "inventory", product_id, ts)
+        if row is not None:
+            return row[0]
+
+        snap = conn.execute(
+            "SELECT quantity, as_of FROM inventory_snapshot "
+            "WHERE product_id = ? AND as_of <= ? ORDER BY as_of DESC LIMIT 1;",
+            (product_id, ts),
+        ).fetchone()
+
+        # Archived movements after the snapshot (or all of them, if none)
+        moved = _level_at(conn, "inventory_archive", product_id, ts,
+                          after=snap[1] if snap else None)
+        if moved is not None:
+            return moved[0]
+        return snap[0] if snap else 0.0
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compact the inventory ledger.")
+    parser.add_argument("--retention-days", type=int, default=DEFAULT_RETENTION_DAYS)
+    parser.add_argument("--interval-days", type=int, default=DEFAULT_INTERVAL_DAYS)
+    args = parser.parse_args()
+
+    result = compact_inventory_ledger(args.retention_days, args.interval_days)
+    print(f"✔ Archived {sum(result.values())} ledger rows across {len(result)} products")
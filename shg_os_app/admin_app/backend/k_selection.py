@@ -0,0 +1,169 @@
+"""
+Automatic choice of the number of SHG clusters.
+
+Every candidate k is fitted on a (seeded) sample of the scaled feature
+matrix and scored three ways:
+  - silhouette (higher is better)
+  - Davies-Bouldin index (lower is better)
+  - inertia elbow: the k furthest from the straight line joining the
+    first and last points of the normalised inertia curve
+
+Candidates are independent, so they are fitted in parallel on a process
+pool. Workers are spawned rather than forked: forking the multithreaded
+Streamlit server can deadlock on locks held by other threads.
+
+Results are cached per feature-store data version: the clustering page
+only pays for the search after SHG data changed.
+
+Run from admin_app/:
+    python -m backend.k_selection --k-min 2 --k-max 10
+"""
+import argparse
+import multiprocessing
+import threading
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import pandas as pd
+from sklearn.cluster import KMeans
+from sklearn.metrics import davies_bouldin_score, silhouette_score
+from sklearn.preprocessing import StandardScaler
+from threadpoolctl import threadpool_limits
+
+from backend.feature_store import NUMERIC_FEATURES, get_data_version, get_shg_feature_matrix
+
+
+DEFAULT_K = 6
+K_MIN = 2
+K_MAX = 10
+SAMPLE_SIZE = 5000
+
+_cache = {}   # (data_version, k_min, k_max, sample_size) -> result
+_lock = threading.Lock()
+
+
+def _evaluate_k(Z, k):
+    """Fit one candidate; runs in a worker process."""
+    # One BLAS/OpenMP thread per worker so the pool does not oversubscribe
+    with threadpool_limits(limits=1):
+        kmeans = KMeans(n_clusters=k, random_state=42, n_init=10).fit(Z)
+        labels = kmeans.labels_
+        distinct = len(np.unique(labels))
+        if distinct < 2:
+            silhouette, davies_bouldin = np.nan, np.nan
+        else:
+            silhouette = silhouette_score(Z, labels)
+            davies_bouldin = davies_bouldin_score(Z, labels)
+    return {
+        "k": k,
+        "inertia": float(kmeans.inertia_),
+        "silhouette": float(silhouette),
+        "davies_bouldin": float(davies_bouldin),
+    }
+
+
+def elbow_k(ks, inertias):
+    """k at the point of maximum distance below the first-to-last chord."""
+    ks = np.asarray(ks, dtype=float)
+    y = np.asarray(inertias, dtype=float)
+    if len(ks) < 3 or y[0] == y[-1]:
+        return int(ks[0])
+    x_norm = (ks - ks[0]) / (ks[-1] - ks[0])
+    y_norm = (y - y[-1]) / (y[0] - y[-1])
+    # the chord runs from (0, 1) to (1, 0); distance below it is 1 - x - y
+    return int(ks[np.argmax(1 - x_norm - y_norm)])
+
+
+def _sample_matrix(features, sample_size):
+    X = features[NUMERIC_FEATURES].to_numpy(dtype=float)
+    if len(X) > sample_size:
+        rng = np.random.default_rng(42)
+        X = X[rng.choice(len(X), size=sample_size, replace=False)]
+    return StandardScaler().fit_transform(X)
+
+
+def _run_candidates(Z, ks, max_workers):
+    if max_workers == 1 or len(ks) == 1:
+        return [_evaluate_k(Z, k) for k in ks]
+    try:
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        ) as pool:
+            return list(pool.map(_evaluate_k, [Z] * len(ks), ks))
+    except (BrokenProcessPool, OSError):
+        # no usable process pool here (sandbox / restricted host)
+        return [_evaluate_k(Z, k) for k in ks]
+
+
+def select_k(k_min=K_MIN, k_max=K_MAX, sample_size=SAMPLE_SIZE, max_workers=None):
+    """
+    Returns {"recommended_k", "votes": {metric: k}, "scores": DataFrame
+    [k, inertia, silhouette, davies_bouldin], "sample_size"}.
+
+    The recommendation is the k at least two of the three metrics agree
+    on, otherwise the silhouette choice.
+    """
+    version = get_data_version()
+    key = (version, k_min, k_max, sample_size)
+    with _lock:
+        if key in _cache:
+            return _cache[key]
+
+    features = get_shg_feature_matrix()
+    n = len(features)
+    # silhouette needs 2 <= k <= n - 1
+    ks = list(range(max(2, k_min), min(k_max, n - 1) + 1))
+    if not ks:
+        result = {
+            "recommended_k": max(1, min(DEFAULT_K, n)),
+            "votes": {},
+            "scores": pd.DataFrame(columns=["k", "inertia", "silhouette", "davies_bouldin"]),
+            "sample_size": n,
+        }
+    else:
+        Z = _sample_matrix(features, sample_size)
+        scores = pd.DataFrame(_run_candidates(Z, ks, max_workers)).sort_values("k")
+
+        votes = {"elbow": elbow_k(scores["k"], scores["inertia"])}
+        if scores["silhouette"].notna().any():
+            votes["silhouette"] = int(scores.loc[scores["silhouette"].idxmax(), "k"])
+        if scores["davies_bouldin"].notna().any():
+            votes["davies_bouldin"] = int(scores.loc[scores["davies_bouldin"].idxmin(), "k"])
+
+        k, count = Counter(votes.values()).most_common(1)[0]
+        recommended = k if count >= 2 else votes.get("silhouette", votes["elbow"])
+        result = {
+            "recommended_k": int(recommended),
+            "votes": votes,
+            "scores": scores.reset_index(drop=True),
+            "sample_size": len(Z),
+        }
+
+    with _lock:
+        # results for older data versions are never looked up again
+        for stale in [cached for cached in _cache if cached[0] != version]:
+            del _cache[stale]
+        _cache[key] = result
+    return result
+
+
+def get_recommended_k():
+    """Cached recommendation for the default k range."""
+    return select_k()["recommended_k"]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recommend the number of SHG clusters.")
+    parser.add_argument("--k-min", type=int, default=K_MIN)
+    parser.add_argument("--k-max", type=int, default=K_MAX)
+    parser.add_argument("--sample-size", type=int, default=SAMPLE_SIZE)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    result = select_k(args.k_min, args.k_max, args.sample_size, args.workers)
+    print(result["scores"].to_string(index=False))
+    print(f"votes: {result['votes']}")
+    print(f"✔ Recommended k = {result['recommended_k']} (sample of {result['sample_size']} SHGs)")
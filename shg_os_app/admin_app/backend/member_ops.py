@@ -1,4 +1,4 @@
-from .database import get_connection
+from .database import get_connection, insert_many
 from datetime import datetime
 
 def create_member(shg_id, name, phone, role):
@@ -20,4 +20,17 @@ def get_members(shg_id):
     )
     rows = cur.fetchall()
     conn.close()
-    return rows
\ No newline at end of file
+    return rows
+
+def create_members(records):
+    """
+    Bulk version of create_member. records: DataFrame / dicts with
+    shg_id, name, phone, role — or tuples in that order.
+    Returns the new member ids.
+    """
+    return insert_many(
+        "member",
+        ["shg_id", "name", "phone", "role"],
+        records,
+        extra={"joined_at": datetime.now().isoformat()},
+    )
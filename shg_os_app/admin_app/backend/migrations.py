@@ -0,0 +1,873 @@
+"""
+Versioned schema migrations for shg_os.db.
+
+The applied version lives in SQLite's PRAGMA user_version, so a
+database only ever runs each step once. To change the schema, append
+a new (version, description, function) entry to MIGRATIONS — never
+edit a step that has already shipped.
+"""
+
+
+def _column_names(cur, table):
+    cur.execute(f"PRAGMA table_info({table})")
+    return [row[1] for row in cur.fetchall()]
+
+
+# ---------- MIGRATION STEPS ----------
+
+def _m001_base_tables(cur):
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS shg (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            village TEXT,
+            district TEXT,
+            state TEXT,
+            created_at TEXT
+        );
+    """)
+
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS member (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            shg_id INTEGER,
+            name TEXT NOT NULL,
+            phone TEXT,
+            role TEXT,
+            joined_at TEXT,
+            FOREIGN KEY (shg_id) REFERENCES shg(id)
+        );
+    """)
+
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS product (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            shg_id INTEGER,
+            name TEXT NOT NULL,
+            category TEXT,
+            unit TEXT,
+            cost_price REAL,
+            selling_price REAL,
+            created_at TEXT,
+            FOREIGN KEY (shg_id) REFERENCES shg(id)
+        );
+    """)
+
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS inventory (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            product_id INTEGER,
+            quantity REAL,
+            updated_at TEXT,
+            FOREIGN KEY (product_id) REFERENCES product(id)
+        );
+    """)
+
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS tx (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            shg_id INTEGER,
+            member_id INTEGER,
+            product_id INTEGER,
+            tx_date TEXT,
+            quantity REAL,
+            amount REAL,
+            tx_type TEXT,
+            description TEXT,
+            FOREIGN KEY (shg_id) REFERENCES shg(id),
+            FOREIGN KEY (member_id) REFERENCES member(id),
+            FOREIGN KEY (product_id) REFERENCES product(id)
+        );
+    """)
+
+    # Member skills (what each person actually does)
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS member_skills (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            member_id INTEGER,
+            skill_category TEXT,
+            sub_skill TEXT,
+            years_experience REAL,
+            FOREIGN KEY (member_id) REFERENCES member(id)
+        );
+    """)
+
+    # Member financial profile
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS member_financials (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            member_id INTEGER,
+            monthly_income REAL,
+            monthly_expense REAL,
+            credit_outstanding REAL,
+            loan_repayment_rate REAL,
+            savings REAL,
+            last_updated TEXT,
+            FOREIGN KEY (member_id) REFERENCES member(id)
+        );
+    """)
+
+    # SHG production capacity
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS shg_production (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            shg_id INTEGER,
+            product_name TEXT,
+            monthly_capacity REAL,
+            supply_ready REAL,
+            FOREIGN KEY (shg_id) REFERENCES shg(id)
+        );
+    """)
+
+    # External demand centers
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS demand_centers (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            location TEXT,
+            district TEXT,
+            state TEXT,
+            product_required TEXT,
+            quantity_required REAL,
+            deadline TEXT,
+            created_at TEXT
+        );
+    """)
+
+
+def _m002_product_type(cur):
+    # Was migrate_add_product_type.py
+    if "product_type" not in _column_names(cur, "shg_production"):
+        cur.execute(
+            "ALTER TABLE shg_production ADD COLUMN product_type TEXT DEFAULT 'non_perishable';"
+        )
+
+
+def _m003_community_chat(cur):
+    # Was update_chat_db.py
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS community_chat (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER,
+            shg_id INTEGER,
+            message TEXT,
+            media_path TEXT,
+            media_type TEXT,         -- image / video / file / None
+            is_admin INTEGER DEFAULT 0,
+            timestamp TEXT
+        );
+    """)
+
+
+def _m004_user_os_tables(cur):
+    # Was user_auth.init_user_table() + update_db_for_user_os.py
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            shg_id INTEGER,
+            username TEXT UNIQUE,
+            password TEXT,
+            created_at TEXT
+        );
+    """)
+
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS shg_production_updates (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            shg_id INTEGER,
+            product_id INTEGER,
+            date TEXT,
+            qty_produced REAL,
+            qty_sold REAL,
+            price REAL,
+            expiry_date TEXT,
+            notes TEXT
+        );
+    """)
+
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS transactions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            shg_id INTEGER,
+            product_id INTEGER,
+            tx_date TEXT,
+            amount REAL,
+            tx_type TEXT,
+            quantity REAL,
+            description TEXT
+        );
+    """)
+
+
+# Secondary indexes for the hot lookup paths. backend/query_plans.py
+# checks that the queries relying on them never fall back to a SCAN.
+HOT_PATH_INDEXES = [
+    ("idx_tx_shg_date", "tx", "shg_id, tx_date"),
+    ("idx_inventory_product", "inventory", "product_id"),
+    ("idx_member_shg", "member", "shg_id"),
+    ("idx_product_shg", "product", "shg_id"),
+    ("idx_member_skills_member", "member_skills", "member_id"),
+    ("idx_member_financials_member", "member_financials", "member_id"),
+    ("idx_shg_production_shg", "shg_production", "shg_id"),
+    ("idx_chat_shg_ts", "community_chat", "shg_id, timestamp"),
+    ("idx_chat_admin_ts", "community_chat", "is_admin, timestamp"),
+]
+
+
+def _m005_hot_path_indexes(cur):
+    for name, table, columns in HOT_PATH_INDEXES:
+        cur.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns});")
+
+
+def _m006_product_stock(cur):
+    # Current stock per product; inventory stays the append-only ledger
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS product_stock (
+            product_id INTEGER PRIMARY KEY,
+            quantity REAL NOT NULL DEFAULT 0,
+            updated_at TEXT,
+            FOREIGN KEY (product_id) REFERENCES product(id)
+        );
+    """)
+
+    # Seed from the latest ledger row of every product
+    cur.execute("""
+        INSERT OR REPLACE INTO product_stock (product_id, quantity, updated_at)
+        SELECT i.product_id, i.quantity, i.updated_at
+        FROM inventory i
+        JOIN (
+            SELECT product_id, MAX(id) AS last_id
+            FROM inventory
+            GROUP BY product_id
+        ) latest ON latest.last_id = i.id;
+    """)
+
+
+def _m007_inventory_snapshots(cur):
+    # Checkpoints + cold storage for the inventory ledger
+    # (see backend/inventory_compaction.py)
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS inventory_snapshot (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            product_id INTEGER,
+            quantity REAL,
+            as_of TEXT,
+            created_at TEXT,
+            UNIQUE (product_id, as_of),
+            FOREIGN KEY (product_id) REFERENCES product(id)
+        );
+    """)
+
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS inventory_archive (
+            id INTEGER PRIMARY KEY,
+            product_id INTEGER,
+            quantity REAL,
+            updated_at TEXT,
+            archived_at TEXT
+        );
+    """)
+
+    cur.execute(
+        "CREATE INDEX IF NOT EXISTS idx_inventory_product_ts ON inventory (product_id, updated_at);"
+    )
+    cur.execute(
+        "CREATE INDEX IF NOT EXISTS idx_inventory_archive_product_ts "
+        "ON inventory_archive (product_id, updated_at);"
+    )
+
+
+# Category lists as they stood when migration 8 shipped
+_M008_INCOME_TYPES = "('income', 'loan_repaid', 'savings', 'sale')"
+_M008_EXPENSE_TYPES = "('expense', 'loan_disbursed', 'purchase')"
+
+
+def _m008_tx_daily_rollup(cur):
+    # Per-SHG, per-day cashflow kept in sync with tx by triggers, so every
+    # writer (ops layer, bulk inserts, user-side pages) is covered
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS tx_daily_rollup (
+            shg_id INTEGER,
+            day TEXT,
+            income REAL NOT NULL DEFAULT 0,
+            expense REAL NOT NULL DEFAULT 0,
+            tx_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (shg_id, day)
+        );
+    """)
+
+    cur.execute("DELETE FROM tx_daily_rollup;")
+    cur.execute(f"""
+        INSERT INTO tx_daily_rollup (shg_id, day, income, expense, tx_count)
+        SELECT shg_id,
+               substr(tx_date, 1, 10),
+               SUM(CASE WHEN tx_type IN {_M008_INCOME_TYPES} THEN COALESCE(amount, 0) ELSE 0 END),
+               SUM(CASE WHEN tx_type IN {_M008_EXPENSE_TYPES} THEN COALESCE(amount, 0) ELSE 0 END),
+               COUNT(*)
+        FROM tx
+        GROUP BY shg_id, substr(tx_date, 1, 10);
+    """)
+
+    def apply_row(row, sign):
+        return f"""
+            INSERT INTO tx_daily_rollup (shg_id, day, income, expense, tx_count)
+            VALUES (
+                {row}.shg_id,
+                substr({row}.tx_date, 1, 10),
+                {sign} CASE WHEN {row}.tx_type IN {_M008_INCOME_TYPES} THEN COALESCE({row}.amount, 0) ELSE 0 END,
+                {sign} CASE WHEN {row}.tx_type IN {_M008_EXPENSE_TYPES} THEN COALESCE({row}.amount, 0) ELSE 0 END,
+                {sign}1
+            )
+            ON CONFLICT (shg_id, day) DO UPDATE SET
+                income = income + excluded.income,
+                expense = expense + excluded.expense,
+                tx_count = tx_count + excluded.tx_count;
+        """
+
+    cur.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_tx_rollup_insert AFTER INSERT ON tx
+        BEGIN {apply_row("NEW", "+")} END;
+    """)
+    cur.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_tx_rollup_delete AFTER DELETE ON tx
+        BEGIN {apply_row("OLD", "-")} END;
+    """)
+    cur.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_tx_rollup_update AFTER UPDATE ON tx
+        BEGIN {apply_row("OLD", "-")} {apply_row("NEW", "+")} END;
+    """)
+
+    cur.execute("""
+        CREATE VIEW IF NOT EXISTS tx_monthly_rollup AS
+        SELECT shg_id,
+               substr(day, 1, 7) AS month,
+               SUM(income) AS income,
+               SUM(expense) AS expense,
+               SUM(tx_count) AS tx_count
+        FROM tx_daily_rollup
+        GROUP BY shg_id, substr(day, 1, 7);
+    """)
+
+
+def _m009_tx_category(cur):
+    # tx_type -> cashflow category lookup, replacing the inline type lists
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS tx_category (
+            tx_type TEXT PRIMARY KEY,
+            category TEXT NOT NULL CHECK (category IN ('income', 'expense', 'neutral'))
+        );
+    """)
+    cur.executemany(
+        "INSERT OR IGNORE INTO tx_category (tx_type, category) VALUES (?, ?);",
+        [
+            ("income", "income"),
+            ("loan_repaid", "income"),
+            ("savings", "income"),
+            ("sale", "income"),
+            ("expense", "expense"),
+            ("loan_disbursed", "expense"),
+            ("purchase", "expense"),
+        ],
+    )
+
+    # Re-point the rollup triggers at the lookup table
+    for name in ("trg_tx_rollup_insert", "trg_tx_rollup_delete", "trg_tx_rollup_update"):
+        cur.execute(f"DROP TRIGGER IF EXISTS {name};")
+
+    def apply_row(row, sign):
+        category = f"(SELECT category FROM tx_category WHERE tx_type = {row}.tx_type)"
+        return f"""
+            INSERT INTO tx_daily_rollup (shg_id, day, income, expense, tx_count)
+            VALUES (
+                {row}.shg_id,
+                substr({row}.tx_date, 1, 10),
+                {sign} CASE WHEN {category} = 'income' THEN COALESCE({row}.amount, 0) ELSE 0 END,
+                {sign} CASE WHEN {category} = 'expense' THEN COALESCE({row}.amount, 0) ELSE 0 END,
+                {sign}1
+            )
+            ON CONFLICT (shg_id, day) DO UPDATE SET
+                income = income + excluded.income,
+                expense = expense + excluded.expense,
+                tx_count = tx_count + excluded.tx_count;
+        """
+
+    cur.execute(f"""
+        CREATE TRIGGER trg_tx_rollup_insert AFTER INSERT ON tx
+        BEGIN {apply_row("NEW", "+")} END;
+    """)
+    cur.execute(f"""
+        CREATE TRIGGER trg_tx_rollup_delete AFTER DELETE ON tx
+        BEGIN {apply_row("OLD", "-")} END;
+    """)
+    cur.execute(f"""
+        CREATE TRIGGER trg_tx_rollup_update AFTER UPDATE ON tx
+        BEGIN {apply_row("OLD", "-")} {apply_row("NEW", "+")} END;
+    """)
+
+
+def _m010_shg_credibility(cur):
+    # Latest portfolio-wide credibility ranking (backend/credibility_engine.py)
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS shg_credibility (
+            shg_id INTEGER PRIMARY KEY,
+            total_income REAL,
+            total_expense REAL,
+            balance REAL,
+            num_txs INTEGER,
+            inventory_value REAL,
+            score INTEGER,
+            rec_code TEXT,
+            rank INTEGER,
+            scored_at TEXT,
+            FOREIGN KEY (shg_id) REFERENCES shg(id)
+        );
+    """)
+
+
+def _m011_shg_data_version(cur):
+    # Per-SHG change counter used to invalidate cached summaries
+    # (backend/summary_cache.py). Bumped by triggers so writes from any
+    # page or process are seen.
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS shg_data_version (
+            shg_id INTEGER PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        );
+    """)
+
+    def bump(shg_expr):
+        return f"""
+            INSERT INTO shg_data_version (shg_id, version) VALUES ({shg_expr}, 1)
+            ON CONFLICT (shg_id) DO UPDATE SET version = version + 1;
+        """
+
+    product_shg = "(SELECT shg_id FROM product WHERE id = {row}.product_id)"
+    triggers = {
+        "trg_version_tx_insert": ("AFTER INSERT ON tx", bump("NEW.shg_id")),
+        "trg_version_tx_update": ("AFTER UPDATE ON tx", bump("OLD.shg_id") + bump("NEW.shg_id")),
+        "trg_version_tx_delete": ("AFTER DELETE ON tx", bump("OLD.shg_id")),
+        "trg_version_product_insert": ("AFTER INSERT ON product", bump("NEW.shg_id")),
+        "trg_version_product_update": ("AFTER UPDATE ON product", bump("OLD.shg_id") + bump("NEW.shg_id")),
+        "trg_version_product_delete": ("AFTER DELETE ON product", bump("OLD.shg_id")),
+        "trg_version_stock_insert": (
+            "AFTER INSERT ON product_stock", bump(product_shg.format(row="NEW"))
+        ),
+        "trg_version_stock_update": (
+            "AFTER UPDATE ON product_stock", bump(product_shg.format(row="NEW"))
+        ),
+    }
+    for name, (event, body) in triggers.items():
+        cur.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {event} BEGIN {body} END;")
+
+
+def _version_triggers(cur, table):
+    """Register `table` in table_data_version and bump it on every write."""
+    cur.execute(
+        "INSERT OR IGNORE INTO table_data_version (table_name, version) VALUES (?, 0);",
+        (table,),
+    )
+    for event in ("INSERT", "UPDATE", "DELETE"):
+        cur.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_version_{table}_{event.lower()}
+            AFTER {event} ON {table}
+            BEGIN
+                UPDATE table_data_version SET version = version + 1
+                WHERE table_name = '{table}';
+            END;
+        """)
+
+
+# Tables whose changes invalidate the in-process SHG feature store
+_M012_VERSIONED_TABLES = ["shg", "member", "member_skills", "member_financials", "shg_production"]
+
+
+def _m012_table_data_version(cur):
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS table_data_version (
+            table_name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        );
+    """)
+    for table in _M012_VERSIONED_TABLES:
+        _version_triggers(cur, table)
+
+
+def _m013_cluster_model(cur):
+    # Persisted SHG cluster models (backend/cluster_model.py). Centroids
+    # live in the scaled feature space; `labels` holds the stable cluster
+    # id of each centroid, carried over between refits.
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS cluster_model (
+            version INTEGER PRIMARY KEY AUTOINCREMENT,
+            n_clusters INTEGER NOT NULL,
+            feature_cols TEXT NOT NULL,
+            scaler_mean TEXT NOT NULL,
+            scaler_scale TEXT NOT NULL,
+            centroids TEXT NOT NULL,
+            labels TEXT NOT NULL,
+            inertia REAL,
+            n_samples INTEGER,
+            data_version TEXT,
+            label_diff TEXT,
+            fitted_at TEXT
+        );
+    """)
+
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS shg_cluster (
+            shg_id INTEGER PRIMARY KEY,
+            cluster_label INTEGER NOT NULL,
+            model_version INTEGER NOT NULL,
+            assigned_at TEXT,
+            FOREIGN KEY (shg_id) REFERENCES shg(id),
+            FOREIGN KEY (model_version) REFERENCES cluster_model(version)
+        );
+    """)
+    cur.execute(
+        "CREATE INDEX IF NOT EXISTS idx_shg_cluster_label "
+        "ON shg_cluster(cluster_label);"
+    )
+
+
+def _m014_district_demand(cur):
+    # District x skill demand reference data (backend/demand_store.py),
+    # ingested from india_district_demand_large.csv instead of re-parsing
+    # the CSV on every geo page.
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS district_demand (
+            state TEXT NOT NULL,
+            district TEXT NOT NULL,
+            skill_category TEXT NOT NULL,
+            latitude REAL,
+            longitude REAL,
+            monthly_demand REAL,
+            priority_level INTEGER,
+            loaded_at TEXT,
+            PRIMARY KEY (state, district, skill_category)
+        );
+    """)
+    cur.execute(
+        "CREATE INDEX IF NOT EXISTS idx_district_demand_skill "
+        "ON district_demand(skill_category, state, district);"
+    )
+    _version_triggers(cur, "district_demand")
+
+
+def _m015_shg_location(cur):
+    # Geocoded SHG coordinates (backend/geocoder.py) plus a cache of
+    # resolved (state, district, village) queries. Cache rows carry the
+    # gazetteer's content hash so a new gazetteer invalidates them.
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS shg_location (
+            shg_id INTEGER PRIMARY KEY,
+            query_key TEXT NOT NULL,
+            latitude REAL,
+            longitude REAL,
+            precision TEXT NOT NULL,
+            matched_name TEXT,
+            match_score REAL,
+            geocoded_at TEXT,
+            FOREIGN KEY (shg_id) REFERENCES shg(id)
+        );
+    """)
+
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS geocode_cache (
+            query_key TEXT PRIMARY KEY,
+            gazetteer_hash TEXT NOT NULL,
+            latitude REAL,
+            longitude REAL,
+            precision TEXT NOT NULL,
+            matched_name TEXT,
+            match_score REAL,
+            created_at TEXT
+        );
+    """)
+
+    # Editing or deleting an SHG drops its location so it is re-geocoded
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_shg_location_reset
+        AFTER UPDATE OF village, district, state ON shg
+        BEGIN
+            DELETE FROM shg_location WHERE shg_id = NEW.id;
+        END;
+    """)
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_shg_location_delete
+        AFTER DELETE ON shg
+        BEGIN
+            DELETE FROM shg_location WHERE shg_id = OLD.id;
+        END;
+    """)
+    _version_triggers(cur, "shg_location")
+
+
+def _m016_geo_cluster_results(cur):
+    # Materialized geo clustering runs (backend/geo_cluster_store.py), one
+    # per (skill_category, k, data_version); '' is the all-skills run.
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS geo_cluster_run (
+            run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            skill_category TEXT NOT NULL,
+            k INTEGER NOT NULL,
+            data_version TEXT NOT NULL,
+            num_shgs INTEGER,
+            computed_at TEXT
+        );
+    """)
+    cur.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_geo_cluster_run_key "
+        "ON geo_cluster_run(skill_category, k, data_version);"
+    )
+
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS geo_cluster_assignment (
+            run_id INTEGER NOT NULL,
+            shg_id INTEGER NOT NULL,
+            cluster_label INTEGER NOT NULL,
+            name TEXT,
+            district TEXT,
+            state TEXT,
+            skill_category TEXT,
+            latitude REAL,
+            longitude REAL,
+            total_capacity REAL,
+            monthly_demand REAL,
+            nearby_demand REAL,
+            demand_gap REAL,
+            PRIMARY KEY (run_id, shg_id),
+            FOREIGN KEY (run_id) REFERENCES geo_cluster_run(run_id)
+        );
+    """)
+
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS geo_cluster_summary (
+            run_id INTEGER NOT NULL,
+            cluster_label INTEGER NOT NULL,
+            num_shgs INTEGER,
+            states TEXT,
+            top_skill TEXT,
+            avg_capacity REAL,
+            avg_demand REAL,
+            avg_gap REAL,
+            PRIMARY KEY (run_id, cluster_label),
+            FOREIGN KEY (run_id) REFERENCES geo_cluster_run(run_id)
+        );
+    """)
+
+
+def _m017_rollup_undated_day(cur):
+    # NULLs never conflict in a primary key, so every undated tx used to
+    # add its own (shg_id, NULL) rollup row. Undated rows now share day ''.
+    day = "COALESCE(substr({row}.tx_date, 1, 10), '')"
+    category = "(SELECT category FROM tx_category WHERE tx_type = {row}.tx_type)"
+
+    cur.execute("DELETE FROM tx_daily_rollup;")
+    cur.execute(f"""
+        INSERT INTO tx_daily_rollup (shg_id, day, income, expense, tx_count)
+        SELECT shg_id,
+               {day.format(row="tx")} AS d,
+               SUM(CASE WHEN {category.format(row="tx")} = 'income' THEN COALESCE(amount, 0) ELSE 0 END),
+               SUM(CASE WHEN {category.format(row="tx")} = 'expense' THEN COALESCE(amount, 0) ELSE 0 END),
+               COUNT(*)
+        FROM tx
+        GROUP BY shg_id, d;
+    """)
+
+    for name in ("trg_tx_rollup_insert", "trg_tx_rollup_delete", "trg_tx_rollup_update"):
+        cur.execute(f"DROP TRIGGER IF EXISTS {name};")
+
+    def apply_row(row, sign):
+        return f"""
+            INSERT INTO tx_daily_rollup (shg_id, day, income, expense, tx_count)
+            VALUES (
+                {row}.shg_id,
+                {day.format(row=row)},
+                {sign} CASE WHEN {category.format(row=row)} = 'income' THEN COALESCE({row}.amount, 0) ELSE 0 END,
+                {sign} CASE WHEN {category.format(row=row)} = 'expense' THEN COALESCE({row}.amount, 0) ELSE 0 END,
+                {sign}1
+            )
+            ON CONFLICT (shg_id, day) DO UPDATE SET
+                income = income + excluded.income,
+                expense = expense + excluded.expense,
+                tx_count = tx_count + excluded.tx_count;
+        """
+
+    cur.execute(f"""
+        CREATE TRIGGER trg_tx_rollup_insert AFTER INSERT ON tx
+        BEGIN {apply_row("NEW", "+")} END;
+    """)
+    cur.execute(f"""
+        CREATE TRIGGER trg_tx_rollup_delete AFTER DELETE ON tx
+        BEGIN {apply_row("OLD", "-")} END;
+    """)
+    cur.execute(f"""
+        CREATE TRIGGER trg_tx_rollup_update AFTER UPDATE ON tx
+        BEGIN {apply_row("OLD", "-")} {apply_row("NEW", "+")} END;
+    """)
+
+
+def _m018_rollup_by_tx_type(cur):
+    # Roll up by tx_type and classify on read: tx_daily_rollup becomes a
+    # view over tx_type_daily_rollup joined to tx_category, so editing a
+    # category re-buckets history instead of leaving stale income/expense.
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS tx_type_daily_rollup (
+            shg_id INTEGER,
+            day TEXT NOT NULL,
+            tx_type TEXT NOT NULL,
+            amount REAL NOT NULL DEFAULT 0,
+            tx_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (shg_id, day, tx_type)
+        );
+    """)
+    day = "COALESCE(substr({row}.tx_date, 1, 10), '')"
+    tx_type = "COALESCE({row}.tx_type, '')"
+
+    cur.execute("DELETE FROM tx_type_daily_rollup;")
+    cur.execute(f"""
+        INSERT INTO tx_type_daily_rollup (shg_id, day, tx_type, amount, tx_count)
+        SELECT shg_id, {day.format(row="tx")} AS d, {tx_type.format(row="tx")} AS t,
+               SUM(COALESCE(amount, 0)), COUNT(*)
+        FROM tx
+        GROUP BY shg_id, d, t;
+    """)
+
+    for name in ("trg_tx_rollup_insert", "trg_tx_rollup_delete", "trg_tx_rollup_update"):
+        cur.execute(f"DROP TRIGGER IF EXISTS {name};")
+
+    def apply_row(row, sign):
+        return f"""
+            INSERT INTO tx_type_daily_rollup (shg_id, day, tx_type, amount, tx_count)
+            VALUES (
+                {row}.shg_id,
+                {day.format(row=row)},
+                {tx_type.format(row=row)},
+                {sign} COALESCE({row}.amount, 0),
+                {sign}1
+            )
+            ON CONFLICT (shg_id, day, tx_type) DO UPDATE SET
+                amount = amount + excluded.amount,
+                tx_count = tx_count + excluded.tx_count;
+        """
+
+    cur.execute(f"""
+        CREATE TRIGGER trg_tx_rollup_insert AFTER INSERT ON tx
+        BEGIN {apply_row("NEW", "+")} END;
+    """)
+    cur.execute(f"""
+        CREATE TRIGGER trg_tx_rollup_delete AFTER DELETE ON tx
+        BEGIN {apply_row("OLD", "-")} END;
+    """)
+    cur.execute(f"""
+        CREATE TRIGGER trg_tx_rollup_update AFTER UPDATE ON tx
+        BEGIN {apply_row("OLD", "-")} {apply_row("NEW", "+")} END;
+    """)
+
+    # Same columns as before, so every reader keeps working unchanged
+    cur.execute("DROP VIEW IF EXISTS tx_monthly_rollup;")
+    cur.execute("DROP TABLE IF EXISTS tx_daily_rollup;")
+    cur.execute("""
+        CREATE VIEW tx_daily_rollup AS
+        SELECT r.shg_id,
+               r.day,
+               SUM(CASE WHEN c.category = 'income' THEN r.amount ELSE 0 END) AS income,
+               SUM(CASE WHEN c.category = 'expense' THEN r.amount ELSE 0 END) AS expense,
+               SUM(r.tx_count) AS tx_count
+        FROM tx_type_daily_rollup r
+        LEFT JOIN tx_category c ON c.tx_type = r.tx_type
+        GROUP BY r.shg_id, r.day;
+    """)
+    cur.execute("""
+        CREATE VIEW tx_monthly_rollup AS
+        SELECT shg_id,
+               substr(day, 1, 7) AS month,
+               SUM(income) AS income,
+               SUM(expense) AS expense,
+               SUM(tx_count) AS tx_count
+        FROM tx_daily_rollup
+        GROUP BY shg_id, substr(day, 1, 7);
+    """)
+
+    # A category edit changes every SHG's totals: invalidate all cached summaries
+    bump_all = """
+        INSERT INTO shg_data_version (shg_id, version)
+        SELECT id, 1 FROM shg WHERE true
+        ON CONFLICT (shg_id) DO UPDATE SET version = version + 1;
+    """
+    for event in ("INSERT", "UPDATE", "DELETE"):
+        cur.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_version_tx_category_{event.lower()}
+            AFTER {event} ON tx_category
+            BEGIN {bump_all} END;
+        """)
+
+
+MIGRATIONS = [
+    (1, "base tables", _m001_base_tables),
+    (2, "shg_production.product_type", _m002_product_type),
+    (3, "community_chat", _m003_community_chat),
+    (4, "user OS tables", _m004_user_os_tables),
+    (5, "hot path indexes", _m005_hot_path_indexes),
+    (6, "product_stock", _m006_product_stock),
+    (7, "inventory snapshots + archive", _m007_inventory_snapshots),
+    (8, "tx daily rollup", _m008_tx_daily_rollup),
+    (9, "tx_category lookup", _m009_tx_category),
+    (10, "shg_credibility", _m010_shg_credibility),
+    (11, "shg_data_version", _m011_shg_data_version),
+    (12, "table_data_version", _m012_table_data_version),
+    (13, "cluster_model + shg_cluster", _m013_cluster_model),
+    (14, "district_demand", _m014_district_demand),
+    (15, "shg_location + geocode_cache", _m015_shg_location),
+    (16, "geo cluster results", _m016_geo_cluster_results),
+    (17, "tx rollup: undated transactions", _m017_rollup_undated_day),
+    (18, "tx rollup by tx_type, classified on read", _m018_rollup_by_tx_type),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+# ---------- RUNNER ----------
+
+def get_schema_version(conn):
+    return conn.execute("PRAGMA user_version;").fetchone()[0]
+
+
+def apply_migrations(conn):
+    """
+    Apply every migration newer than the DB's user_version.
+    Each step runs in its own BEGIN IMMEDIATE transaction together with
+    the version bump, so a crash never leaves a half-applied step and
+    two processes starting at once cannot both apply it.
+
+    Returns the list of (version, description) steps applied.
+    """
+    applied = []
+    if get_schema_version(conn) >= LATEST_VERSION:
+        return applied
+
+    cur = conn.cursor()
+    for version, description, step in MIGRATIONS:
+        cur.execute("BEGIN IMMEDIATE;")
+        try:
+            # Re-check under the write lock: another process may have won
+            if get_schema_version(conn) >= version:
+                conn.rollback()
+                continue
+            step(cur)
+            cur.execute(f"PRAGMA user_version = {int(version)};")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        applied.append((version, description))
+
+    return applied
+
+
+if __name__ == "__main__":
+    # Run from admin_app/:  python -m backend.migrations
+    from backend.database import get_connection
+
+    conn = get_connection()
+    print(f"✔ Schema is at version {get_schema_version(conn)} (latest {LATEST_VERSION})")
+    conn.close()
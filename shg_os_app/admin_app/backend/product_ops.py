@@ -1,16 +1,26 @@
-from .database import get_connection
+from .database import get_connection, transaction, insert_many
 from datetime import datetime
 
 def create_product(shg_id, name, category, unit, cost_price, selling_price):
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute(
-        "INSERT INTO product (shg_id, name, category, unit, cost_price, selling_price, created_at) "
-        "VALUES (?, ?, ?, ?, ?, ?, ?)",
-        (shg_id, name, category, unit, cost_price, selling_price, datetime.now().isoformat())
+    with transaction() as conn:
+        conn.execute(
+            "INSERT INTO product (shg_id, name, category, unit, cost_price, selling_price, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (shg_id, name, category, unit, cost_price, selling_price, datetime.now().isoformat())
+        )
+
+def create_products(records):
+    """
+    Bulk version of create_product. records: DataFrame / dicts with
+    shg_id, name, category, unit, cost_price, selling_price — or tuples
+    in that order. Returns the new product ids.
+    """
+    return insert_many(
+        "product",
+        ["shg_id", "name", "category", "unit", "cost_price", "selling_price"],
+        records,
+        extra={"created_at": datetime.now().isoformat()},
     )
-    conn.commit()
-    conn.close()
 
 def get_products(shg_id):
     conn = get_connection()
@@ -23,25 +33,71 @@ def get_products(shg_id):
     conn.close()
     return rows
 
+def _current_stock(conn, product_id):
+    row = conn.execute(
+        "SELECT quantity FROM product_stock WHERE product_id = ?;",
+        (product_id,)
+    ).fetchone()
+    return row[0] if row else 0.0
+
 def get_inventory_for_product(product_id):
     conn = get_connection()
-    cur = conn.cursor()
-    cur.execute(
-        "SELECT quantity FROM inventory WHERE product_id = ? ORDER BY id DESC LIMIT 1;",
-        (product_id,)
-    )
-    row = cur.fetchone()
+    qty = _current_stock(conn, product_id)
     conn.close()
-    return row[0] if row else 0.0
+    return qty
+
+def get_inventory_for_products(product_ids):
+    """
+    Current stock for many products in one query.
+    Returns {product_id: quantity}; products with no stock row map to 0.0.
+    """
+    product_ids = list(product_ids)
+    stock = {pid: 0.0 for pid in product_ids}
+    if not product_ids:
+        return stock
 
-def update_inventory(product_id, quantity_change):
-    current_qty = get_inventory_for_product(product_id)
-    new_qty = current_qty + quantity_change
     conn = get_connection()
-    cur = conn.cursor()
-    cur.execute(
-        "INSERT INTO inventory (product_id, quantity, updated_at) VALUES (?, ?, ?)",
-        (product_id, new_qty, datetime.now().isoformat())
-    )
-    conn.commit()
-    conn.close()
\ No newline at end of file
+    # Stay well under SQLite's bound-parameter limit
+    for start in range(0, len(product_ids), 900):
+        chunk = product_ids[start:start + 900]
+        placeholders = ", ".join("?" for _ in chunk)
+        rows = conn.execute(
+            f"SELECT product_id, quantity FROM product_stock WHERE product_id IN ({placeholders});",
+            chunk
+        ).fetchall()
+        for pid, qty in rows:
+            stock[pid] = qty
+    conn.close()
+    return stock
+
+def get_inventory_for_shg(shg_id):
+    """
+    Current stock for every product of an SHG in one query.
+    Returns {product_id: quantity}.
+    """
+    conn = get_connection()
+    rows = conn.execute(
+        "SELECT p.id, COALESCE(s.quantity, 0.0) FROM product p "
+        "LEFT JOIN product_stock s ON s.product_id = p.id "
+        "WHERE p.shg_id = ?;",
+        (shg_id,)
+    ).fetchall()
+    conn.close()
+    return dict(rows)
+
+def update_inventory(product_id, quantity_change):
+    # Apply the delta in SQL (no read-modify-write in Python) and append
+    # the resulting level to the ledger in the same unit of work
+    now = datetime.now().isoformat()
+    with transaction() as conn:
+        conn.execute(
+            "INSERT INTO product_stock (product_id, quantity, updated_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(product_id) DO UPDATE SET "
+            "quantity = quantity + excluded.quantity, updated_at = excluded.updated_at;",
+            (product_id, quantity_change, now)
+        )
+        new_qty = _current_stock(conn, product_id)
+        conn.execute(
+            "INSERT INTO inventory (product_id, quantity, updated_at) VALUES (?, ?, ?)",
+            (product_id, new_qty, now)
+        )
@@ -0,0 +1,150 @@
+"""
+EXPLAIN QUERY PLAN guard for the hot lookup paths.
+
+Every query in HOT_QUERIES must be answered through an index. A plan
+step that SCANs a table not listed in its allowed set means an index
+from migrations.HOT_PATH_INDEXES is missing or no longer usable.
+Queries in RANGE_SEEKS must additionally seek on their keyset cursor.
+
+Run from admin_app/:  python -m backend.query_plans
+(exits non-zero if any hot query falls back to a SCAN)
+"""
+import sqlite3
+import sys
+
+from backend.database import DB_PATH, init_db
+from backend.tx_ops import DAILY_ROLLUP_SQL, TX_PAGE_SQL, TX_PAGE_UNDATED_SQL
+
+
+# name -> (sql, number of SCAN steps allowed)
+# The member joins read one whole table by design; the other side of
+# the join must still be an index SEARCH.
+HOT_QUERIES = {
+    "get_transactions": (
+        "SELECT id, tx_date, amount, tx_type, description, product_id, quantity "
+        "FROM tx WHERE shg_id = ? ORDER BY tx_date;",
+        0,
+    ),
+    "get_transactions_page": (
+        TX_PAGE_SQL.format(filters="shg_id = ? AND (tx_date, id) < (?, ?)"),
+        0,
+    ),
+    "get_transactions_page_undated": (
+        TX_PAGE_UNDATED_SQL.format(filters="shg_id = ? AND id < ?"),
+        0,
+    ),
+    "get_daily_rollup": (
+        DAILY_ROLLUP_SQL.format(range=""),
+        0,
+    ),
+    "get_inventory_for_product": (
+        "SELECT quantity FROM product_stock WHERE product_id = ?;",
+        0,
+    ),
+    "get_inventory_for_shg": (
+        "SELECT p.id, COALESCE(s.quantity, 0.0) FROM product p "
+        "LEFT JOIN product_stock s ON s.product_id = p.id WHERE p.shg_id = ?;",
+        0,
+    ),
+    "get_members": (
+        "SELECT id, name, phone, role FROM member WHERE shg_id = ? ORDER BY id;",
+        0,
+    ),
+    "get_products": (
+        "SELECT id, name, category, unit, cost_price, selling_price "
+        "FROM product WHERE shg_id = ? ORDER BY id;",
+        0,
+    ),
+    "get_skills_for_member": (
+        "SELECT skill_category, sub_skill, years_experience "
+        "FROM member_skills WHERE member_id = ?",
+        0,
+    ),
+    "get_financials_for_member": (
+        "SELECT monthly_income, monthly_expense, credit_outstanding, "
+        "loan_repayment_rate, savings FROM member_financials WHERE member_id = ?",
+        0,
+    ),
+    "get_capacity_for_shg": (
+        "SELECT product_name, monthly_capacity, supply_ready "
+        "FROM shg_production WHERE shg_id = ?",
+        0,
+    ),
+    "member_skills_join": (
+        "SELECT m.shg_id, s.skill_category, s.years_experience "
+        "FROM member m JOIN member_skills s ON m.id = s.member_id",
+        1,
+    ),
+    "member_financials_join": (
+        "SELECT m.shg_id, f.monthly_income, f.monthly_expense, f.savings "
+        "FROM member m JOIN member_financials f ON m.id = f.member_id",
+        1,
+    ),
+    "load_messages_my_shg": (
+        "SELECT * FROM community_chat WHERE (shg_id = ? OR is_admin = 1) "
+        "ORDER BY timestamp ASC",
+        0,
+    ),
+    "load_messages_announcements": (
+        "SELECT * FROM community_chat WHERE is_admin = 1 ORDER BY timestamp ASC",
+        0,
+    ),
+    "get_district_demand": (
+        "SELECT * FROM district_demand WHERE skill_category = ? "
+        "ORDER BY state, district",
+        0,
+    ),
+}
+
+
+# Keyset queries must also seek on the cursor: an index SEARCH on shg_id
+# alone walks every row from the newest one, like OFFSET would
+RANGE_SEEKS = {
+    "get_transactions_page": "tx_date<?",
+    "get_transactions_page_undated": "rowid<?",
+}
+
+
+def explain(conn, sql):
+    params = (1,) * sql.count("?")
+    rows = conn.execute("EXPLAIN QUERY PLAN " + sql, params).fetchall()
+    return [r[3] for r in rows]
+
+
+def find_table_scans(conn=None):
+    """
+    Returns a list of (query_name, plan_step) for every hot query with
+    more SCAN steps than it is allowed, or without its range seek.
+    Empty list == healthy.
+    """
+    own_conn = conn is None
+    if own_conn:
+        init_db()
+        # Uncached connection: a cached EXPLAIN keeps its old plan even
+        # after an index is dropped
+        conn = sqlite3.connect(DB_PATH, cached_statements=0)
+
+    problems = []
+    try:
+        for name, (sql, max_scans) in HOT_QUERIES.items():
+            plan = explain(conn, sql)
+            scans = [step for step in plan if step.startswith("SCAN ")]
+            if len(scans) > max_scans:
+                problems.extend((name, step) for step in scans)
+            seek = RANGE_SEEKS.get(name)
+            if seek and not any(seek in step for step in plan):
+                problems.extend((name, f"no {seek} range seek: {step}") for step in plan)
+    finally:
+        if own_conn:
+            conn.close()
+
+    return problems
+
+
+if __name__ == "__main__":
+    scans = find_table_scans()
+    for name, step in scans:
+        print(f"❌ {name}: {step}")
+    if scans:
+        sys.exit(1)
+    print(f"✔ All {len(HOT_QUERIES)} hot queries use an index.")
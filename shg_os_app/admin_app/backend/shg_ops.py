@@ -8,8 +8,10 @@ def create_shg(name, village, district, state):
         "INSERT INTO shg (name, village, district, state, created_at) VALUES (?, ?, ?, ?, ?)",
         (name, village, district, state, datetime.now().isoformat())
     )
+    shg_id = cur.lastrowid
     conn.commit()
     conn.close()
+    return shg_id
 
 def get_shgs():
     conn = get_connection()
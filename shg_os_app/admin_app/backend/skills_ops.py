@@ -1,5 +1,5 @@
 from datetime import datetime
-from .database import get_connection
+from .database import get_connection, insert_many
 
 # --------- Skills ----------
 
@@ -16,6 +16,18 @@ def add_skill(member_id, skill_category, sub_skill, years_experience):
     conn.commit()
     conn.close()
 
+def add_skills(records):
+    """
+    Bulk version of add_skill. records: DataFrame / dicts with member_id,
+    skill_category, sub_skill, years_experience — or tuples in that order.
+    Returns the new member_skills ids.
+    """
+    return insert_many(
+        "member_skills",
+        ["member_id", "skill_category", "sub_skill", "years_experience"],
+        records,
+    )
+
 def get_skills_for_member(member_id):
     conn = get_connection()
     cur = conn.cursor()
@@ -0,0 +1,145 @@
+"""
+Haversine spatial indexes over SHGs and district demand centres.
+
+GeoIndex wraps a scikit-learn BallTree on (lat, lon) in radians with the
+haversine metric, so k-nearest and radius queries run in O(log n) per
+point instead of scanning every row:
+
+    demand = get_demand_index("Pottery")
+    demand.within(lat, lon, radius_km=150)   # all Pottery demand within 150 km
+    get_shg_index().nearest(lat, lon, k=10)  # 10 closest SHGs
+
+Indexes are cached per data version of their source tables and rebuilt
+only after those tables change.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+from sklearn.neighbors import BallTree
+
+from backend.database import get_connection
+from backend.demand_store import get_district_demand
+from backend.feature_store import get_data_version
+from backend.geocoder import ensure_shg_locations, geocode_place
+
+
+EARTH_RADIUS_KM = 6371.0088
+
+_lock = threading.Lock()
+_indexes = {}   # name -> (data_version, GeoIndex)
+
+
+class GeoIndex:
+    """BallTree over the latitude/longitude columns of `points` (rows without coordinates are dropped)."""
+
+    def __init__(self, points):
+        points = points.dropna(subset=["latitude", "longitude"])
+        self.points = points.reset_index(drop=True)
+        coords = np.radians(self.points[["latitude", "longitude"]].to_numpy(dtype=float))
+        self._tree = BallTree(coords, metric="haversine") if len(coords) else None
+
+    def __len__(self):
+        return len(self.points)
+
+    @staticmethod
+    def _query_coords(lats, lons):
+        return np.radians(np.column_stack([np.atleast_1d(lats), np.atleast_1d(lons)]).astype(float))
+
+    def nearest_many(self, lats, lons, k=1):
+        """Batch kNN: (distances_km, indices) arrays of shape (n_queries, k)."""
+        k = min(k, len(self))
+        if self._tree is None or k == 0:
+            n = len(np.atleast_1d(lats))
+            return np.empty((n, 0)), np.empty((n, 0), dtype=int)
+        dist, idx = self._tree.query(self._query_coords(lats, lons), k=k)
+        return dist * EARTH_RADIUS_KM, idx
+
+    def within_many(self, lats, lons, radius_km):
+        """Batch radius query: (indices, distances_km) lists with one array per query point, nearest first."""
+        if self._tree is None:
+            n = len(np.atleast_1d(lats))
+            return [np.empty(0, dtype=int)] * n, [np.empty(0)] * n
+        idx, dist = self._tree.query_radius(
+            self._query_coords(lats, lons),
+            r=radius_km / EARTH_RADIUS_KM,
+            return_distance=True,
+            sort_results=True,
+        )
+        return list(idx), [d * EARTH_RADIUS_KM for d in dist]
+
+    def _rows(self, idx, dist):
+        out = self.points.iloc[idx].copy()
+        out["distance_km"] = dist
+        return out.sort_values("distance_km").reset_index(drop=True)
+
+    def nearest(self, lat, lon, k=1):
+        """The k closest points to (lat, lon) with a distance_km column."""
+        dist, idx = self.nearest_many(lat, lon, k)
+        return self._rows(idx[0], dist[0])
+
+    def within(self, lat, lon, radius_km):
+        """All points within radius_km of (lat, lon), nearest first."""
+        idx, dist = self.within_many(lat, lon, radius_km)
+        return self._rows(idx[0], dist[0])
+
+
+def _cached(name, tables, build):
+    version = get_data_version(tables)
+    with _lock:
+        hit = _indexes.get(name)
+        if hit is not None and hit[0] == version:
+            return hit[1]
+    index = GeoIndex(build())
+    with _lock:
+        _indexes[name] = (version, index)
+    return index
+
+
+def locate_district(district, state=None):
+    """(lat, lon) of a district (or, failing that, state) via the geocoder, or None."""
+    place = geocode_place(state, district)
+    if place["latitude"] is None:
+        return None
+    return place["latitude"], place["longitude"]
+
+
+def load_shg_points():
+    """
+    SHGs with their geocoded coordinates (shg_location). Unresolved SHGs
+    keep NULL coordinates instead of being placed at (0, 0).
+    """
+    conn = get_connection()
+    df = pd.read_sql_query(
+        """
+        SELECT g.id AS shg_id, g.name, g.village, g.district, g.state,
+               l.latitude, l.longitude, l.precision
+        FROM shg g
+        LEFT JOIN shg_location l ON l.shg_id = g.id
+        ORDER BY g.id;
+        """,
+        conn,
+    )
+    conn.close()
+    return df
+
+
+def get_shg_index():
+    ensure_shg_locations()
+    return _cached("shg", ("shg", "shg_location"), load_shg_points)
+
+
+def get_demand_index(skill_category=None):
+    """Demand centres, optionally for one skill category."""
+    name = f"demand:{skill_category}" if skill_category else "demand"
+    return _cached(name, ("district_demand",), lambda: get_district_demand(skill_category))
+
+
+def demand_near_shg(shg_id, skill_category=None, radius_km=150):
+    """Demand rows within radius_km of an SHG (empty if the SHG has no coordinates)."""
+    shgs = get_shg_index().points
+    row = shgs[shgs["shg_id"] == int(shg_id)]
+    demand = get_demand_index(skill_category)
+    if row.empty:
+        return demand._rows(np.empty(0, dtype=int), np.empty(0))
+    return demand.within(row["latitude"].iloc[0], row["longitude"].iloc[0], radius_km)
@@ -0,0 +1,69 @@
+"""
+Per-SHG cache for the dashboard snapshot (summary tuple + chart series).
+
+Entries are keyed by shg_id and tagged with that SHG's row in
+shg_data_version, which triggers bump on every tx / product / stock
+write. A lookup costs one primary-key read; the summary and chart are
+only recomputed after something for that SHG was actually written.
+"""
+import threading
+from collections import OrderedDict
+
+from backend.database import get_connection
+from backend.business_logic import compute_shg_summary
+from backend.tx_ops import get_daily_rollup
+
+
+MAX_ENTRIES = 2048
+
+_cache = OrderedDict()   # shg_id -> (version, payload)
+_lock = threading.Lock()
+
+
+def get_shg_version(shg_id):
+    conn = get_connection()
+    row = conn.execute(
+        "SELECT version FROM shg_data_version WHERE shg_id = ?;",
+        (shg_id,),
+    ).fetchone()
+    conn.close()
+    return row[0] if row else 0
+
+
+def get_shg_dashboard(shg_id):
+    """
+    Returns {"summary": (income, expense, balance, score, inventory_value, rec),
+             "daily": [(day, income, expense, tx_count)],
+             "num_txs": int}
+    """
+    version = get_shg_version(shg_id)
+
+    with _lock:
+        hit = _cache.get(shg_id)
+        if hit is not None and hit[0] == version:
+            _cache.move_to_end(shg_id)
+            return hit[1]
+
+    daily = get_daily_rollup(shg_id)
+    payload = {
+        "summary": compute_shg_summary(shg_id),
+        "daily": daily,
+        "num_txs": sum(int(r[3]) for r in daily),
+    }
+
+    with _lock:
+        _cache[shg_id] = (version, payload)
+        _cache.move_to_end(shg_id)
+        while len(_cache) > MAX_ENTRIES:
+            _cache.popitem(last=False)
+
+    return payload
+
+
+def invalidate(shg_id=None):
+    """Drop one SHG's entry, or everything when shg_id is None."""
+    with _lock:
+        if shg_id is None:
+            _cache.clear()
+        else:
+            _cache.pop(shg_id, None)
@@ -0,0 +1,38 @@
+"""
+SQL-side aggregation for the per-SHG business snapshot.
+
+Cashflow totals come from tx_type_daily_rollup (one row per SHG, day and
+tx_type) and inventory value from product + product_stock, in a single
+statement. Which tx_types count as income / expense lives in the
+tx_category table and is applied at read time, so category edits take
+effect immediately.
+"""
+from backend.database import get_connection
+
+
+SNAPSHOT_SQL = """
+    WITH cash AS (
+        SELECT COALESCE(SUM(CASE WHEN c.category = 'income' THEN r.amount ELSE 0 END), 0) AS total_income,
+               COALESCE(SUM(CASE WHEN c.category = 'expense' THEN r.amount ELSE 0 END), 0) AS total_expense,
+               COALESCE(SUM(r.tx_count), 0) AS num_txs
+        FROM tx_type_daily_rollup r
+        LEFT JOIN tx_category c ON c.tx_type = r.tx_type
+        WHERE r.shg_id = :shg_id
+    ),
+    stock AS (
+        SELECT COALESCE(SUM(COALESCE(s.quantity, 0) * COALESCE(p.cost_price, 0)), 0) AS inventory_value
+        FROM product p
+        LEFT JOIN product_stock s ON s.product_id = p.id
+        WHERE p.shg_id = :shg_id
+    )
+    SELECT cash.total_income, cash.total_expense, cash.num_txs, stock.inventory_value
+    FROM cash, stock;
+"""
+
+
+def load_shg_snapshot(shg_id):
+    """Returns (total_income, total_expense, num_txs, inventory_value)."""
+    conn = get_connection()
+    row = conn.execute(SNAPSHOT_SQL, {"shg_id": shg_id}).fetchone()
+    conn.close()
+    return row
@@ -1,15 +1,26 @@
-from .database import get_connection
+from .database import get_connection, transaction, insert_many
+
+TX_TYPES = ["income", "expense", "loan_disbursed", "loan_repaid", "savings", "sale", "purchase"]
 
 def add_transaction(shg_id, member_id, product_id, tx_date, quantity, amount, tx_type, description):
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute(
-        "INSERT INTO tx (shg_id, member_id, product_id, tx_date, quantity, amount, tx_type, description) "
-        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
-        (shg_id, member_id, product_id, tx_date, quantity, amount, tx_type, description)
+    with transaction() as conn:
+        conn.execute(
+            "INSERT INTO tx (shg_id, member_id, product_id, tx_date, quantity, amount, tx_type, description) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (shg_id, member_id, product_id, tx_date, quantity, amount, tx_type, description)
+        )
+
+def add_transactions(records):
+    """
+    Bulk version of add_transaction. records: DataFrame / dicts with
+    shg_id, member_id, product_id, tx_date, quantity, amount, tx_type,
+    description — or tuples in that order. Returns the new tx ids.
+    """
+    return insert_many(
+        "tx",
+        ["shg_id", "member_id", "product_id", "tx_date", "quantity", "amount", "tx_type", "description"],
+        records,
     )
-    conn.commit()
-    conn.close()
 
 def get_transactions(shg_id):
     conn = get_connection()
@@ -20,4 +31,136 @@ def get_transactions(shg_id):
     )
     rows = cur.fetchall()
     conn.close()
-    return rows
\ No newline at end of file
+    return rows
+
+def _tx_filters(shg_id, start_date=None, end_date=None, tx_types=None):
+    clauses = ["shg_id = ?"]
+    params = [shg_id]
+    if start_date:
+        clauses.append("tx_date >= ?")
+        params.append(str(start_date))
+    if end_date:
+        # tx_date may carry a time part; compare against the next day
+        clauses.append("tx_date < date(?, '+1 day')")
+        params.append(str(end_date))
+    if tx_types:
+        clauses.append(f"tx_type IN ({', '.join('?' for _ in tx_types)})")
+        params.extend(tx_types)
+    return clauses, params
+
+TX_PAGE_COLUMNS = "id, tx_date, amount, tx_type, description, product_id, quantity"
+
+# Dated rows by (tx_date, id) keyset; undated rows (which sort last) by id
+TX_PAGE_SQL = (
+    f"SELECT {TX_PAGE_COLUMNS} FROM tx WHERE {{filters}} "
+    "ORDER BY tx_date DESC, id DESC LIMIT ?;"
+)
+TX_PAGE_UNDATED_SQL = (
+    f"SELECT {TX_PAGE_COLUMNS} FROM tx WHERE {{filters}} AND tx_date IS NULL "
+    "ORDER BY id DESC LIMIT ?;"
+)
+
+def get_transactions_page(shg_id, page_size=50, after=None,
+                          start_date=None, end_date=None, tx_types=None):
+    """
+    One page of an SHG's cashbook, newest first.
+    `after` is the (tx_date, id) cursor returned for the previous page;
+    keyset paging keeps every page an index range read, however deep.
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+
+    Rows without a tx_date sort after every dated row (NULLs are smallest
+    in SQLite) and never satisfy the (tx_date, id) comparison, so once the
+    dated rows run out the page is topped up from a separate id-ordered
+    query over the undated ones.
+    """
+    clauses, params = _tx_filters(shg_id, start_date, end_date, tx_types)
+    limit = page_size + 1
+    undated_cursor = after is not None and after[0] is None
+
+    conn = get_connection()
+    rows = []
+    if not undated_cursor:
+        if after is None:
+            keyset, keyset_params = "tx_date IS NOT NULL", []
+        else:
+            keyset, keyset_params = "(tx_date, id) < (?, ?)", list(after)
+        rows = conn.execute(
+            TX_PAGE_SQL.format(filters=" AND ".join(clauses + [keyset])),
+            params + keyset_params + [limit],
+        ).fetchall()
+    if len(rows) < limit:
+        extra, extra_params = (["id < ?"], [after[1]]) if undated_cursor else ([], [])
+        rows += conn.execute(
+            TX_PAGE_UNDATED_SQL.format(filters=" AND ".join(clauses + extra)),
+            params + extra_params + [limit - len(rows)],
+        ).fetchall()
+    conn.close()
+
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1]
+        return rows, (last[1], last[0])
+    return rows, None
+
+def count_transactions(shg_id, start_date=None, end_date=None, tx_types=None):
+    clauses, params = _tx_filters(shg_id, start_date, end_date, tx_types)
+    conn = get_connection()
+    n = conn.execute(
+        f"SELECT COUNT(*) FROM tx WHERE {' AND '.join(clauses)};",
+        params
+    ).fetchone()[0]
+    conn.close()
+    return n
+
+# --------- Cashflow rollups (tx_type_daily_rollup, kept in sync by triggers) ----------
+# Rows are per (shg_id, day, tx_type); income / expense are classified here,
+# at read time, through tx_category. The per-SHG readers query the table
+# directly rather than the tx_daily_rollup view, so shg_id is an index seek.
+
+CASHFLOW_SUMS = (
+    "SUM(CASE WHEN c.category = 'income' THEN r.amount ELSE 0 END), "
+    "SUM(CASE WHEN c.category = 'expense' THEN r.amount ELSE 0 END), "
+    "SUM(r.tx_count)"
+)
+ROLLUP_FROM = (
+    "FROM tx_type_daily_rollup r "
+    "LEFT JOIN tx_category c ON c.tx_type = r.tx_type "
+    "WHERE r.shg_id = ?"
+)
+DAILY_ROLLUP_SQL = f"SELECT r.day, {CASHFLOW_SUMS} {ROLLUP_FROM}{{range}} GROUP BY r.day ORDER BY r.day;"
+
+def get_daily_rollup(shg_id, start_date=None, end_date=None):
+    """
+    Returns [(day, income, expense, tx_count)] ordered by day.
+    Transactions without a tx_date are rolled up under day ''.
+    """
+    day_range = ""
+    params = [shg_id]
+    if start_date:
+        day_range += " AND r.day >= ?"
+        params.append(str(start_date))
+    if end_date:
+        day_range += " AND r.day <= ?"
+        params.append(str(end_date))
+    conn = get_connection()
+    rows = conn.execute(DAILY_ROLLUP_SQL.format(range=day_range), params).fetchall()
+    conn.close()
+    return rows
+
+def get_monthly_rollup(shg_id):
+    """Returns [(month 'YYYY-MM', income, expense, tx_count)] ordered by month."""
+    conn = get_connection()
+    rows = conn.execute(
+        f"SELECT substr(r.day, 1, 7) AS month, {CASHFLOW_SUMS} {ROLLUP_FROM} "
+        "GROUP BY month ORDER BY month;",
+        (shg_id,)
+    ).fetchall()
+    conn.close()
+    return rows
+
+def get_cashflow_totals(shg_id):
+    """Returns (total_income, total_expense, tx_count) for an SHG."""
+    conn = get_connection()
+    income, expense, count = conn.execute(f"SELECT {CASHFLOW_SUMS} {ROLLUP_FROM};", (shg_id,)).fetchone()
+    conn.close()
+    return income or 0, expense or 0, count or 0
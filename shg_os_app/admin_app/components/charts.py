@@ -1,24 +1,102 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 from .ui_cards import load_css
 
-def income_expense_chart(transactions):
+TARGET_POINTS = 300
+
+def lttb_indices(y, threshold, x=None):
+    """
+    Largest-Triangle-Three-Buckets: indices of `threshold` points of the
+    series y (sampled at x, default 0..n-1) that best preserve its visual shape.
+    """
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    y = np.asarray(y, dtype=float)
+    x = np.arange(n, dtype=float) if x is None else np.asarray(x, dtype=float)
+    # First and last points are always kept; the rest is split into buckets
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+
+    picked = [0]
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # Average of the next bucket (or the last point) is the third vertex
+        nlo, nhi = hi, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[nlo:nhi].mean()
+        avg_y = y[nlo:nhi].mean()
+
+        areas = np.abs(
+            (x[a] - avg_x) * (y[lo:hi] - y[a])
+            - (x[a] - x[lo:hi]) * (avg_y - y[a])
+        )
+        a = lo + int(areas.argmax())
+        picked.append(a)
+
+    picked.append(n - 1)
+    return np.array(picked)
+
+
+def downsample(df, threshold=TARGET_POINTS):
+    """
+    At most `threshold` rows, chosen by LTTB on one reference series: the
+    row-wise sum of absolute values, so a peak in any column is kept.
+    A DatetimeIndex is used as the x axis, so uneven gaps between days are
+    weighted by their real length.
+    """
+    if len(df) <= threshold:
+        return df
+    reference = df.abs().sum(axis=1).to_numpy()
+    x = df.index.asi8 / 86_400e9 if isinstance(df.index, pd.DatetimeIndex) else None
+    return df.iloc[lttb_indices(reference, threshold, x)]
+
+
+def income_expense_chart(daily_rollup, key="cashflow", target_points=TARGET_POINTS):
+    """
+    daily_rollup: [(day, income, expense, tx_count)] as returned by
+    tx_ops.get_daily_rollup — already one row per day, so no pivoting.
+    Plots the selected range at daily resolution and LTTB-downsamples it
+    to `target_points`, so the payload stays small for multi-year histories.
+    """
     load_css()
-    if not transactions:
+    if not daily_rollup:
         st.info("Not enough data to show chart yet.")
         return
 
-    rows = []
-    for _id, tx_date, amount, tx_type, desc, product_id, qty in transactions:
-        rows.append({"date": tx_date, "amount": float(amount), "type": tx_type})
+    df = pd.DataFrame(daily_rollup, columns=["date", "Income", "Expense", "count"])
+    # Undated transactions (day '') count in the totals but have no place on the axis
+    df["date"] = pd.to_datetime(df["date"], errors="coerce")
+    df = df.dropna(subset=["date"])
+    if df.empty:
+        st.info("Not enough data to show chart yet.")
+        return
 
-    df = pd.DataFrame(rows)
-    df["date"] = pd.to_datetime(df["date"]).dt.date
-    df["category"] = df["type"].apply(
-        lambda t: "Income" if t in ["income", "loan_repaid", "savings", "sale"] else "Expense"
+    first, last = df["date"].min().date(), df["date"].max().date()
+    selected = st.date_input(
+        "Chart date range",
+        value=(first, last),
+        min_value=first,
+        max_value=last,
+        key=f"{key}_range",
     )
+    start, end = selected if len(selected) == 2 else (first, last)
 
-    pivot = df.pivot_table(index="date", columns="category", values="amount",
-                           aggfunc="sum", fill_value=0).reset_index()
+    df = df[(df["date"].dt.date >= start) & (df["date"].dt.date <= end)]
+    if df.empty:
+        st.info("No transactions in the selected range.")
+        return
+
+    # Daily totals, the finest bucket; only days with transactions have a
+    # row, so empty days are left out rather than plotted as zero
+    series = df.set_index("date")[["Expense", "Income"]]
+    days = len(series)
+    series = downsample(series, target_points)
+    series.index = series.index.date
 
-    st.line_chart(pivot.set_index("date"), height=260)
\ No newline at end of file
+    st.line_chart(series, height=260)
+    st.caption(
+        f"Daily totals · {len(series)} points"
+        + (f" (LTTB-downsampled from {days} days)" if len(series) < days else "")
+    )
@@ -0,0 +1,119 @@
+import numpy as np
+import pandas as pd
+from folium.plugins import FastMarkerCluster, HeatMap
+
+# Above this many points in view, points are binned on a zoom-dependent grid
+MAX_RAW_POINTS = 2000
+# Grid cell size in screen pixels at the current zoom
+CELL_PX = 48
+
+
+def _escape(s):
+    return (
+        s.astype(str)
+        .str.replace("&", "&amp;", regex=False)
+        .str.replace("<", "&lt;", regex=False)
+        .str.replace(">", "&gt;", regex=False)
+    )
+
+
+def in_bounds(df, bounds):
+    """Rows whose latitude/longitude fall inside (south, west, north, east)."""
+    if bounds is None:
+        return df
+    south, west, north, east = bounds
+    lat, lon = df["latitude"].to_numpy(), df["longitude"].to_numpy()
+    return df[(lat >= south) & (lat <= north) & (lon >= west) & (lon <= east)]
+
+
+def grid_aggregate(lat, lon, weight, zoom, cell_px=CELL_PX):
+    """
+    Bin points on a grid of cell_px screen pixels at `zoom`.
+    Returns a DataFrame [latitude, longitude, weight, count] with one row
+    per non-empty cell, placed at the weight-averaged position.
+    """
+    cell_deg = 360.0 / (256 * 2 ** float(zoom)) * cell_px
+    lat = np.asarray(lat, dtype=float)
+    lon = np.asarray(lon, dtype=float)
+    weight = np.asarray(weight, dtype=float)
+
+    cells = np.column_stack([np.floor(lat / cell_deg), np.floor(lon / cell_deg)])
+    _, inverse, counts = np.unique(cells, axis=0, return_inverse=True, return_counts=True)
+    inverse = inverse.ravel()
+
+    # |weight| for positioning so negative values (gaps) do not flip centroids
+    w = np.abs(weight) + 1e-9
+    w_sum = np.bincount(inverse, weights=w)
+    return pd.DataFrame({
+        "latitude": np.bincount(inverse, weights=lat * w) / w_sum,
+        "longitude": np.bincount(inverse, weights=lon * w) / w_sum,
+        "weight": np.bincount(inverse, weights=weight),
+        "count": counts,
+    })
+
+
+def prepare_points(df, value_col, zoom, bounds=None, label=None, title=None):
+    """
+    Columnar point payload for the view: raw rows while there are at most
+    MAX_RAW_POINTS in bounds, otherwise grid cells. Returns a DataFrame
+    [latitude, longitude, weight, count, label].
+    `label` is a Series of popup HTML for the raw rows; `title` names the
+    summed value in the popups of aggregated cells.
+    """
+    title = title or value_col
+    df = in_bounds(df.dropna(subset=["latitude", "longitude"]), bounds)
+    if len(df) <= MAX_RAW_POINTS:
+        out = pd.DataFrame({
+            "latitude": df["latitude"].to_numpy(dtype=float),
+            "longitude": df["longitude"].to_numpy(dtype=float),
+            "weight": df[value_col].to_numpy(dtype=float),
+            "count": 1,
+        })
+        out["label"] = (
+            label.loc[df.index].to_numpy() if label is not None
+            else "<b>" + title + ":</b> " + out["weight"].map("{:,.0f}".format)
+        )
+        return out
+
+    out = grid_aggregate(df["latitude"], df["longitude"], df[value_col], zoom)
+    out["label"] = (
+        "<b>" + out["count"].astype(str) + " points</b><br>"
+        "<b>Total " + title + ":</b> " + out["weight"].round(0).astype(int).astype(str)
+    )
+    return out
+
+
+def point_layer(points, name, color):
+    """
+    One FastMarkerCluster built client-side from the columnar rows:
+    the page HTML carries a single data array instead of one marker
+    object per point.
+    """
+    callback = f"""
+    function (row) {{
+        var radius = row[3] > 1 ? Math.min(6 + 2 * Math.log2(row[3]), 20) : 6;
+        var marker = L.circleMarker(new L.LatLng(row[0], row[1]), {{
+            radius: radius, weight: 1, color: "{color}",
+            fill: true, fillColor: "{color}", fillOpacity: 0.8
+        }});
+        marker.bindPopup(row[4]);
+        return marker;
+    }};
+    """
+    data = points[["latitude", "longitude", "weight", "count", "label"]].to_numpy().tolist()
+    return FastMarkerCluster(data, callback=callback, name=name)
+
+
+def heat_layer(points, name="Heatmap", **kwargs):
+    """HeatMap from the (possibly aggregated) columnar points in one call."""
+    data = points[["latitude", "longitude", "weight"]].to_numpy(dtype=float).tolist()
+    return HeatMap(data, name=name, **kwargs)
+
+
+def popup_labels(df, fields):
+    """Vectorised popup HTML: fields is [(title, column, format)] → Series aligned with df."""
+    html = pd.Series("", index=df.index)
+    for title, col, fmt in fields:
+        values = df[col].map(fmt.format) if fmt else _escape(df[col])
+        html = html + f"<b>{title}:</b> " + values + "<br>"
+    return html
@@ -1,7 +1,6 @@
 import streamlit as st
 import pandas as pd
 
-from backend.database import init_db
 from backend.shg_health_engine import compute_shg_health
 from components.ui_cards import section_header, glass_card
 
@@ -11,8 +10,6 @@ st.set_page_config(
     layout="wide",
 )
 
-init_db()
-
 section_header(
     "SHG Health & Risk Index",
     "🚦",
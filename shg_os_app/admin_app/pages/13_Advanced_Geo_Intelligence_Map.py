@@ -1,9 +1,12 @@
 import streamlit as st
-import pandas as pd
 import folium
 from streamlit_folium import st_folium
-import json
-import os
+
+from backend.demand_store import get_demand_skills, get_district_demand
+from backend.geo_tiles import SOURCE_GEOJSON, get_geojson
+from backend.geo_cluster_store import available_ks, load_geo_clusters
+from backend.spatial_index import get_shg_index
+from components.map_layers import heat_layer, point_layer, popup_labels, prepare_points
 
 st.set_page_config(
     page_title="Advanced Geo-Intelligence Dashboard",
@@ -12,36 +15,29 @@ st.set_page_config(
 )
 
 # ----------------------------
-# LOAD DEMAND DATA
-# ----------------------------
-@st.cache_data
-def load_demand_data():
-    path = "india_district_demand_large.csv"
-    if not os.path.exists(path):
-        st.error("❌ Demand CSV not found. Please make sure 'india_district_demand_large.csv' exists in streamlit_app/")
-        return None
-    df = pd.read_csv(path)
-    return df
-
-# ----------------------------
-# LOAD GEOJSON
+# MAP VIEW (zoom / bounds reported by the previous render)
 # ----------------------------
-@st.cache_data
-def load_geojson():
-    geo_path = "data/india_districts.geojson"
-    if not os.path.exists(geo_path):
-        st.error("❌ GeoJSON file not found in /data folder.")
-        return None
-    with open(geo_path, "r") as f:
-        gj = json.load(f)
-    return gj
+def current_view(default_zoom=5):
+    """(zoom, (south, west, north, east) padded by half a screen, or None)."""
+    state = st.session_state.get("geo_map") or {}
+    zoom = state.get("zoom") or default_zoom
+    b = state.get("bounds") or {}
+    sw, ne = b.get("_southWest"), b.get("_northEast")
+    if not sw or not ne or sw.get("lat") is None:
+        return zoom, None
+    pad_lat = (ne["lat"] - sw["lat"]) / 2
+    pad_lng = (ne["lng"] - sw["lng"]) / 2
+    return zoom, (sw["lat"] - pad_lat, sw["lng"] - pad_lng, ne["lat"] + pad_lat, ne["lng"] + pad_lng)
 
 
 # Load files
-demand_df = load_demand_data()
-geojson_data = load_geojson()
+skills = get_demand_skills()
 
-if demand_df is None or geojson_data is None:
+if not skills:
+    st.error("❌ No district demand data. Load it with: python -m backend.demand_store")
+    st.stop()
+if not SOURCE_GEOJSON.exists():
+    st.error("❌ GeoJSON file not found in /data folder.")
     st.stop()
 
 
@@ -56,10 +52,9 @@ st.markdown("---")
 # ----------------------------
 # PRODUCT FILTER
 # ----------------------------
-skills = sorted(demand_df["skill_category"].unique())
 selected_skill = st.selectbox("Select Product / Skill Category", skills)
 
-df_skill = demand_df[demand_df["skill_category"] == selected_skill]
+df_skill = get_district_demand(selected_skill)
 
 # ----------------------------
 # AGGREGATE DEMAND & SUPPLY BY DISTRICT
@@ -80,17 +75,23 @@ district_view["gap"] = district_view["total_demand"] - district_view["supply"]
 # ----------------------------
 # MAP CENTER
 # ----------------------------
-center_lat = district_view["latitude"].mean()
-center_lon = district_view["longitude"].mean()
+zoom, view_bounds = current_view()
+if view_bounds:
+    center_lat = (view_bounds[0] + view_bounds[2]) / 2
+    center_lon = (view_bounds[1] + view_bounds[3]) / 2
+else:
+    center_lat = district_view["latitude"].mean()
+    center_lon = district_view["longitude"].mean()
 
-m = folium.Map(location=[center_lat, center_lon], zoom_start=5, tiles="CartoDB positron")
+m = folium.Map(location=[center_lat, center_lon], zoom_start=zoom, tiles="CartoDB positron")
 
 
 # ----------------------------
 # ADD DISTRICT POLYGONS
 # ----------------------------
+# Pre-simplified boundaries for this zoom level, only around the view
 folium.GeoJson(
-    geojson_data,
+    get_geojson(zoom, view_bounds),
     name="District Boundaries",
     style_function=lambda x: {
         "fillColor": "#00000000",
@@ -100,34 +101,44 @@ folium.GeoJson(
 ).add_to(m)
 
 # ----------------------------
-# ADD DEMAND MARKERS
-# ----------------------------
-for _, row in district_view.iterrows():
-    tooltip = f"""
-    <b>District:</b> {row['district']}<br>
-    <b>State:</b> {row['state']}<br>
-    <b>Product:</b> {selected_skill}<br><br>
-    <b>Total Demand:</b> {row['total_demand']:,}<br>
-    <b>Supply Available:</b> {row['supply']:,}<br>
-    <b>Demand–Supply Gap:</b> {row['gap']:,}<br>
-    """
+# ADD DEMAND & SHG MARKERS
+# ----------------------------
+# Built from column arrays in one call each; beyond MAX_RAW_POINTS in view
+# the points are binned per zoom level before they reach the browser
+district_view["product"] = selected_skill
+demand_popups = popup_labels(district_view, [
+    ("District", "district", None),
+    ("State", "state", None),
+    ("Product", "product", None),
+    ("Total Demand", "total_demand", "{:,}"),
+    ("Supply Available", "supply", "{:,}"),
+    ("Demand–Supply Gap", "gap", "{:,}"),
+])
+point_layer(
+    prepare_points(district_view, "total_demand", zoom, view_bounds,
+                   label=demand_popups, title="Demand"),
+    name="Demand Centres",
+    color="#2A62F4",
+).add_to(m)
 
-    folium.CircleMarker(
-        location=[row["latitude"], row["longitude"]],
-        radius=7,
-        weight=1,
-        color="#2A62F4",
-        fill=True,
-        fill_color="#2A62F4",
-        popup=tooltip,
-        fill_opacity=0.8,
-    ).add_to(m)
+shg_points = get_shg_index().points.assign(shgs=1)
+point_layer(
+    prepare_points(
+        shg_points, "shgs", zoom, view_bounds,
+        label=popup_labels(shg_points, [
+            ("SHG", "name", None),
+            ("Village", "village", None),
+            ("District", "district", None),
+        ]),
+        title="SHGs",
+    ),
+    name="SHGs",
+    color="#E4572E",
+).add_to(m)
 
 # ----------------------------
 # HEATMAPS (DEMAND / SUPPLY / GAP)
 # ----------------------------
-from folium.plugins import HeatMap
-
 st.subheader("🔥 Heatmaps")
 
 heatmap_type = st.radio(
@@ -136,26 +147,24 @@ heatmap_type = st.radio(
     horizontal=True,
 )
 
-if heatmap_type == "Demand":
-    heat_data = district_view[["latitude", "longitude", "total_demand"]].values.tolist()
-elif heatmap_type == "Supply":
-    heat_data = district_view[["latitude", "longitude", "supply"]].values.tolist()
-else:
-    heat_data = district_view[["latitude", "longitude", "gap"]].values.tolist()
+heat_col = {"Demand": "total_demand", "Supply": "supply"}.get(heatmap_type, "gap")
 
-HeatMap(
-    heat_data,
+heat_layer(
+    prepare_points(district_view, heat_col, zoom, view_bounds),
+    name=f"{heatmap_type} Heatmap",
     radius=28,
     blur=20,
     max_zoom=6,
 ).add_to(m)
 
+folium.LayerControl(collapsed=True).add_to(m)
+
 
 # ----------------------------
 # DISPLAY MAP
 # ----------------------------
 st.markdown("### 🗺 Interactive Geo-Map")
-st_folium(m, width=1400, height=700)
+st_folium(m, width=1400, height=700, key="geo_map", returned_objects=["zoom", "bounds"])
 
 
 # ----------------------------
@@ -170,3 +179,30 @@ st.dataframe(
     ].sort_values("gap", ascending=False),
     use_container_width=True,
 )
+
+
+# ----------------------------
+# SHG GEO CLUSTERS (precomputed by backend.geo_cluster_store)
+# ----------------------------
+st.markdown("---")
+st.subheader(f"🧩 SHG Geo Clusters for: **{selected_skill}**")
+
+cluster_ks = available_ks(selected_skill)
+if not cluster_ks:
+    st.info("No precomputed geo clusters for this skill yet. Run: python -m backend.geo_cluster_store")
+else:
+    k = st.select_slider(
+        "Number of clusters",
+        options=cluster_ks,
+        value=6 if 6 in cluster_ks else cluster_ks[0],
+    )
+    shg_clusters, geo_summary, run = load_geo_clusters(selected_skill, k)
+
+    st.caption(f"Computed {run['computed_at'][:16]} · {run['num_shgs']} SHGs")
+    if run["stale"]:
+        st.caption("⚠️ SHG data changed since this run; the next precompute job will refresh it.")
+
+    if geo_summary.empty:
+        st.info("No SHGs with this dominant skill.")
+    else:
+        st.dataframe(geo_summary, use_container_width=True, hide_index=True)
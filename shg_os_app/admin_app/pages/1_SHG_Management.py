@@ -1,9 +1,9 @@
 import streamlit as st
-from backend.database import init_db
 from backend.shg_ops import create_shg, get_shgs
+from backend.cluster_model import assign_cluster
+from backend.geocoder import geocode_shgs
 from components.ui_cards import section_header
 
-init_db()
 st.set_page_config(page_title="SHG Management", page_icon="🏠", layout="wide")
 
 section_header("SHG Management", "🏠", "Create and manage Self-Help Groups")
@@ -22,7 +22,10 @@ with st.form("create_shg_form"):
         if not name.strip():
             st.error("SHG name is required.")
         else:
-            create_shg(name.strip(), village.strip(), district.strip(), state.strip())
+            shg_id = create_shg(name.strip(), village.strip(), district.strip(), state.strip())
+            geocode_shgs([shg_id])
+            # Nearest-centroid lookup against the persisted model; no refit
+            assign_cluster(shg_id)
             st.success("SHG created successfully.")
             st.rerun()
 
@@ -1,10 +1,8 @@
 import streamlit as st
-from backend.database import init_db
 from backend.shg_ops import get_shgs
 from backend.member_ops import get_members, create_member
 from components.ui_cards import section_header
 
-init_db()
 st.set_page_config(page_title="Members", page_icon="👥", layout="wide")
 
 section_header("Members", "👥", "Onboard and view SHG members")
@@ -1,13 +1,12 @@
 import streamlit as st
 from datetime import date
 
-from backend.database import init_db
+from backend.database import transaction
 from backend.shg_ops import get_shgs
-from backend.product_ops import get_products, create_product, get_inventory_for_product, update_inventory
+from backend.product_ops import get_products, create_product, get_inventory_for_product, get_inventory_for_shg, update_inventory
 from backend.tx_ops import add_transaction
 from components.ui_cards import section_header
 
-init_db()
 st.set_page_config(page_title="Products & Inventory", page_icon="📦", layout="wide")
 
 section_header("Products & Inventory", "📦", "Configure products and manage stock levels")
@@ -25,9 +24,10 @@ else:
     products = get_products(shg_id)
     if products:
         table = {"ID": [], "Name": [], "Category": [], "Unit": [], "Cost Price": [], "Selling Price": [], "Stock Qty": []}
+        stock = get_inventory_for_shg(shg_id)
         for p in products:
             pid, name, cat, unit, cp, sp = p
-            qty = get_inventory_for_product(pid)
+            qty = stock.get(pid, 0.0)
             table["ID"].append(pid)
             table["Name"].append(name)
             table["Category"].append(cat)
@@ -74,9 +74,10 @@ else:
         reason = st.selectbox("Reason", ["production_add", "damage", "adjustment"])
 
         if st.button("Apply Change"):
-            update_inventory(prod_id, qty_change)
-            add_transaction(shg_id, None, prod_id, date.today().isoformat(), qty_change, 0.0,
-                            f"inventory_{reason}", f"Inventory adjustment: {reason}")
+            with transaction():
+                update_inventory(prod_id, qty_change)
+                add_transaction(shg_id, None, prod_id, date.today().isoformat(), qty_change, 0.0,
+                                f"inventory_{reason}", f"Inventory adjustment: {reason}")
             st.success("Inventory updated.")
             st.rerun()
     else:
@@ -1,13 +1,12 @@
 import streamlit as st
 from datetime import date
 
-from backend.database import init_db
+from backend.database import transaction
 from backend.shg_ops import get_shgs
 from backend.product_ops import get_products, update_inventory
-from backend.tx_ops import add_transaction, get_transactions
+from backend.tx_ops import TX_TYPES, add_transaction, count_transactions, get_transactions_page
 from components.ui_cards import section_header
 
-init_db()
 st.set_page_config(page_title="Transactions", page_icon="💰", layout="wide")
 
 section_header("Transactions / Cashbook", "💰", "Record income, expenses, loans, sales and purchases")
@@ -22,7 +21,31 @@ else:
     shg_id = id_map[selected]
 
     st.subheader("Existing Transactions")
-    txs = get_transactions(shg_id)
+
+    f1, f2 = st.columns(2)
+    with f1:
+        type_filter = st.multiselect("Filter by type", TX_TYPES)
+        use_dates = st.checkbox("Filter by date range")
+    with f2:
+        page_size = st.selectbox("Rows per page", [25, 50, 100], index=1)
+        start_date = end_date = None
+        if use_dates:
+            date_range = st.date_input("Date range", value=(date.today().replace(day=1), date.today()))
+            if len(date_range) == 2:
+                start_date, end_date = date_range
+
+    # Keyset cursors for the pages visited so far; reset when filters change
+    filter_key = (shg_id, tuple(type_filter), start_date, end_date, page_size)
+    if st.session_state.get("tx_filter_key") != filter_key:
+        st.session_state["tx_filter_key"] = filter_key
+        st.session_state["tx_cursors"] = [None]
+    cursors = st.session_state["tx_cursors"]
+
+    total = count_transactions(shg_id, start_date, end_date, type_filter)
+    txs, next_cursor = get_transactions_page(
+        shg_id, page_size, cursors[-1], start_date, end_date, type_filter
+    )
+
     if txs:
         display = {"Date": [], "Type": [], "Amount": [], "Product ID": [], "Qty": [], "Description": []}
         for _id, tx_date, amount, tx_type, desc, product_id, qty in txs:
@@ -33,6 +56,17 @@ else:
             display["Qty"].append(qty)
             display["Description"].append(desc)
         st.table(display)
+
+        page_no = len(cursors)
+        num_pages = max(1, -(-total // page_size))
+        nav1, nav2, nav3 = st.columns([1, 2, 1])
+        if nav1.button("⬅ Newer", disabled=page_no == 1):
+            cursors.pop()
+            st.rerun()
+        nav2.caption(f"Page {page_no} of {num_pages} · {total} transactions")
+        if nav3.button("Older ➡", disabled=next_cursor is None):
+            cursors.append(next_cursor)
+            st.rerun()
     else:
         st.info("No transactions yet.")
 
@@ -42,10 +76,7 @@ else:
     col1, col2 = st.columns(2)
     with col1:
         tx_date = st.date_input("Date", value=date.today())
-        tx_type = st.selectbox(
-            "Type",
-            ["income", "expense", "loan_disbursed", "loan_repaid", "savings", "sale", "purchase"],
-        )
+        tx_type = st.selectbox("Type", TX_TYPES)
         amount = st.number_input("Amount (₹)", min_value=0.0, step=10.0)
 
     with col2:
@@ -65,12 +96,14 @@ else:
         if amount <= 0:
             st.error("Amount must be greater than 0.")
         else:
-            if product_id is not None and qty:
-                if tx_type == "sale":
-                    update_inventory(product_id, -qty)
-                elif tx_type == "purchase":
-                    update_inventory(product_id, qty)
+            # Stock movement + cashbook entry commit together or not at all
+            with transaction():
+                if product_id is not None and qty:
+                    if tx_type == "sale":
+                        update_inventory(product_id, -qty)
+                    elif tx_type == "purchase":
+                        update_inventory(product_id, qty)
 
-            add_transaction(shg_id, None, product_id, tx_date.isoformat(), qty, amount, tx_type, desc.strip())
+                add_transaction(shg_id, None, product_id, tx_date.isoformat(), qty, amount, tx_type, desc.strip())
             st.success("Transaction recorded.")
             st.rerun()
\ No newline at end of file
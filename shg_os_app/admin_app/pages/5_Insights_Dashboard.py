@@ -1,13 +1,12 @@
 import streamlit as st
-from backend.database import init_db
 from backend.shg_ops import get_shgs
-from backend.tx_ops import get_transactions
-from backend.product_ops import get_products, get_inventory_for_product
-from backend.business_logic import compute_summary_and_advice
+from backend.product_ops import get_products, get_inventory_for_shg
+from backend.summary_cache import get_shg_dashboard
+from backend.business_logic import REC_MESSAGES
+from backend.credibility_engine import compute_portfolio_credibility, load_portfolio_credibility
 from components.ui_cards import section_header, glass_card
 from components.charts import income_expense_chart
 
-init_db()
 st.set_page_config(page_title="Insights Dashboard", page_icon="📊", layout="wide")
 
 section_header("Insights Dashboard", "📊", "Deeper analytics to guide SHG decisions")
@@ -21,27 +20,53 @@ else:
     selected = st.selectbox("Select SHG", labels)
     shg_id = id_map[selected]
 
-    txs = get_transactions(shg_id)
     products = get_products(shg_id)
-    total_income, total_expense, balance, score, inventory_value, rec = compute_summary_and_advice(txs, products)
+    dashboard = get_shg_dashboard(shg_id)
+    total_income, total_expense, balance, score, inventory_value, rec = dashboard["summary"]
+    num_txs = dashboard["num_txs"]
 
     c1, c2, c3 = st.columns(3)
-    glass_card("Transactions Logged", str(len(txs)), "All-time entries", "🧾")
+    glass_card("Transactions Logged", str(num_txs), "All-time entries", "🧾")
     glass_card("Inventory Value", f"₹{inventory_value:,.0f}", "At cost price", "📦")
     glass_card("Credibility", f"{score}/100", "Financial discipline", "⭐")
 
     st.markdown("### Income vs Expense")
-    income_expense_chart(txs)
+    income_expense_chart(dashboard["daily"])
 
     st.markdown("### Product-wise Stock Snapshot")
     if products:
         table = {"Product": [], "Stock Qty": [], "Unit": []}
+        stock = get_inventory_for_shg(shg_id)
         for p in products:
             pid, name, cat, unit, cp, sp = p
-            qty = get_inventory_for_product(pid)
+            qty = stock.get(pid, 0.0)
             table["Product"].append(name)
             table["Stock Qty"].append(qty)
             table["Unit"].append(unit)
         st.table(table)
     else:
-        st.info("No products defined yet.")
\ No newline at end of file
+        st.info("No products defined yet.")
+
+    st.markdown("### Portfolio Credibility Ranking")
+    ranking = load_portfolio_credibility()
+    if st.button("Recompute ranking") or ranking.empty:
+        compute_portfolio_credibility()
+        ranking = load_portfolio_credibility()
+    if not ranking.empty:
+        st.caption(f"Scored {ranking['scored_at'].iloc[0][:16]} · {len(ranking)} SHGs")
+        ranking["recommendation"] = ranking["rec_code"].map(REC_MESSAGES)
+        st.dataframe(
+            ranking[["rank", "name", "district", "state", "score", "balance", "recommendation"]].rename(
+                columns={
+                    "rank": "Rank",
+                    "name": "SHG",
+                    "district": "District",
+                    "state": "State",
+                    "score": "Score",
+                    "balance": "Balance (₹)",
+                    "recommendation": "Recommendation",
+                }
+            ),
+            use_container_width=True,
+            hide_index=True,
+        )
@@ -1,5 +1,4 @@
 import streamlit as st
-from backend.database import init_db
 from backend.shg_ops import get_shgs
 from backend.member_ops import get_members
 from backend.skills_ops import (
@@ -17,7 +16,6 @@ from backend.capacity_ops import (
 from backend.demand_ops import add_demand, get_all_demand
 from components.ui_cards import section_header, glass_card
 
-init_db()
 st.set_page_config(page_title="Skill & Deployment Engine", page_icon="🧠", layout="wide")
 
 section_header(
@@ -1,8 +1,9 @@
 import streamlit as st
 import pandas as pd
 
-from backend.database import init_db
+from backend.cluster_model import load_active_model
 from backend.clustering_engine import compute_shg_clusters
+from backend.k_selection import K_MAX, select_k
 from components.ui_cards import section_header, glass_card
 
 st.set_page_config(
@@ -11,17 +12,38 @@ st.set_page_config(
     layout="wide",
 )
 
-init_db()
-
 section_header(
     "SHG Clustering Intelligence",
     "🧬",
     "Automatically group SHGs by income, capacity, savings and skills to identify strong and vulnerable clusters."
 )
 
+# Recommend k (cached per data version, so this only runs after data changes)
+with st.spinner("Evaluating cluster counts..."):
+    k_info = select_k()
+
+# Default to the saved model's k: any other k is a one-off preview fit
+saved_model = load_active_model()
+default_k = saved_model["n_clusters"] if saved_model else k_info["recommended_k"]
+
+n_clusters = st.slider(
+    "Number of clusters",
+    min_value=2,
+    max_value=K_MAX,
+    value=min(max(default_k, 2), K_MAX),
+    help="Defaults to the k of the saved cluster model. Other values show a preview that is not saved.",
+)
+if k_info["votes"]:
+    st.caption(
+        f"Recommended k = {k_info['recommended_k']} · votes: "
+        + ", ".join(f"{metric} → {k}" for metric, k in k_info["votes"].items())
+        + f" · sample of {k_info['sample_size']} SHGs"
+        + (f" · saved model uses k = {saved_model['n_clusters']}" if saved_model else "")
+    )
+
 # Compute clusters
 with st.spinner("Computing clusters from SHG data..."):
-    shg_features, cluster_summary = compute_shg_clusters(n_clusters=6)
+    shg_features, cluster_summary, fit = compute_shg_clusters(n_clusters=n_clusters, mode="model")
 
 if shg_features.empty:
     st.warning("No SHG data available to cluster. Make sure you have imported synthetic data and have SHGs in the database.")
@@ -47,6 +69,40 @@ glass_card(
     "⚙️",
 )
 
+with st.expander("Model fit", expanded=False):
+    if fit.get("mode") == "streaming":
+        st.caption(
+            f"Streaming MiniBatchKMeans · batch size {fit['batch_size']} · "
+            f"{fit['epochs']} epoch(s), {fit['batches']} batches · "
+            f"{fit['absorbed']} SHGs {'absorbed incrementally' if fit['incremental'] else 'fitted'}"
+        )
+        if len(fit["inertia_history"]) > 1:
+            st.line_chart(pd.DataFrame({"inertia": fit["inertia_history"]}), height=160)
+    elif fit.get("mode") == "model":
+        st.caption(f"Persisted cluster model v{fit['model_version']} · fitted {fit['fitted_at'][:16]}")
+        diff = fit.get("label_diff") or {}
+        if diff.get("previous_version"):
+            st.caption(
+                f"Since v{diff['previous_version']}: "
+                f"{len(diff['kept'])} clusters kept their id, "
+                f"new {diff['new_labels'] or '—'}, retired {diff['retired_labels'] or '—'}, "
+                f"{diff['moved_shgs']} SHGs changed cluster"
+            )
+    else:
+        st.caption(f"Full KMeans · {fit.get('iterations', 0)} iterations")
+    if fit.get("preview"):
+        st.caption(
+            "One-off fit for this k; the saved cluster model is unchanged. "
+            "Refit it with `python -m backend.cluster_model refit --clusters <k>`."
+        )
+    st.caption(
+        f"Inertia {fit.get('inertia', 0):,.0f} · "
+        f"{'converged' if fit.get('converged') else 'stopped at iteration limit'}"
+    )
+    if not k_info["scores"].empty:
+        st.markdown("**k selection scores**")
+        st.dataframe(k_info["scores"].round(3), use_container_width=True, hide_index=True)
+
 st.markdown("---")
 
 # ---- Cluster summary table ----
@@ -42,7 +42,7 @@ if st.button("Find Best SHG Matches"):
                 result_df[[
                     "shg_id", "name", "district", "state",
                     "product_name", "total_capacity", "total_supply_ready",
-                    "avg_income", "match_score"
+                    "avg_income", "distance_km", "match_score"
                 ]],
                 use_container_width=True
             )
@@ -1,7 +1,6 @@
 import streamlit as st
 import pandas as pd
 
-from backend.database import init_db
 from backend.insights_engine import (
     get_top_products_by_capacity,
     get_underutilized_shgs,
@@ -16,8 +15,6 @@ st.set_page_config(
     layout="wide",
 )
 
-init_db()
-
 section_header(
     "Market & Expansion Insights",
     "🌍",
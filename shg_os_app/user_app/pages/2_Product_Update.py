@@ -13,7 +13,7 @@ sys.path.insert(0, ADMIN_ROOT)
 USER_BACKEND = os.path.join(PHASE2_ROOT, "user_app", "user_backend")
 sys.path.insert(0, USER_BACKEND)
 
-from backend.database import get_connection
+from backend.database import get_connection, transaction
 
 # -----------------------------------------------------
 # CHECK LOGIN
@@ -54,6 +54,7 @@ for c in possible_type_cols:
 if product_type_col is None:
     st.error("❌ ERROR: No product type column found in shg_production table!")
     st.write("Found columns:", col_names)
+    conn.close()
     st.stop()
 
 # -----------------------------------------------------
@@ -68,9 +69,10 @@ query = f"""
 cur.execute(query, (shg_id,))
 products = cur.fetchall()
 
+conn.close()
+
 if not products:
     st.warning("Your SHG has no products added yet.")
-    conn.close()
     st.stop()
 
 product_map = {f"{p[1]} ({p[2]})": p for p in products}
@@ -101,29 +103,27 @@ notes = st.text_area("Notes (optional)")
 # -----------------------------------------------------
 if st.button("💾 Save Today's Update"):
     today = date.today().isoformat()
-
-    cur.execute("""
-        INSERT INTO shg_production_updates
-        (shg_id, product_id, date, qty_produced, qty_sold, price, expiry_date, notes)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-    """, (
-        shg_id, prod_id, today, qty_produced, qty_sold, price,
-        expiry_date.isoformat() if expiry_date else None, notes
-    ))
-
     total_income = price * qty_sold
 
-    cur.execute("""
-        INSERT INTO tx
-        (shg_id, member_id, product_id, tx_date, quantity, amount, tx_type, description)
-        VALUES (?, NULL, ?, ?, ?, ?, ?, ?)
-    """, (
-        shg_id, prod_id, today, qty_sold, total_income,
-        "sale", f"Daily update: {prod_name}"
-    ))
-
-    conn.commit()
-    conn.close()
+    # Production update + sale entry as one atomic write
+    with transaction() as tx_conn:
+        tx_conn.execute("""
+            INSERT INTO shg_production_updates
+            (shg_id, product_id, date, qty_produced, qty_sold, price, expiry_date, notes)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, (
+            shg_id, prod_id, today, qty_produced, qty_sold, price,
+            expiry_date.isoformat() if expiry_date else None, notes
+        ))
+
+        tx_conn.execute("""
+            INSERT INTO tx
+            (shg_id, member_id, product_id, tx_date, quantity, amount, tx_type, description)
+            VALUES (?, NULL, ?, ?, ?, ?, ?, ?)
+        """, (
+            shg_id, prod_id, today, qty_sold, total_income,
+            "sale", f"Daily update: {prod_name}"
+        ))
 
     st.success("Update saved successfully!")
     st.balloons()
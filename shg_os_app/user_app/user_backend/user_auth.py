@@ -1,21 +1,10 @@
 import sqlite3
-from backend.database import get_connection
+from backend.database import get_connection, init_db
 
 
 def init_user_table():
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            shg_id INTEGER,
-            username TEXT UNIQUE,
-            password TEXT,
-            created_at TEXT
-        );
-    """)
-    conn.commit()
-    conn.close()
+    # users table is created by the schema migrations (backend/migrations.py)
+    init_db()
 
 
 def register_user(shg_id, username, password):